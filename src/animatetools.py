@@ -1,8 +1,12 @@
 import colour
 import colortools
 import ledtools
-import time
+import scheduler
 from math import ceil
+from array import array
+from functools import lru_cache, wraps
+
+import numpy
 
 
 # LED design configuration
@@ -25,11 +29,35 @@ AQUA = colour.Color(rgb=(0.00, 1.00, 1.00))
 PINK = colour.Color(rgb=(1.00, 0.00, 0.80))
 BLACK = colour.Color(rgb=(0.00, 0.00, 0.00))
 
+colortools.palette.add([RED, LIME, BLUE, PURPLE, YELLOW, ORANGE, WHITE, GOLD, SPRING_GREEN, TURQUOISE, AQUA, PINK, BLACK])
+
 LOW_BRIGHTNESS = 55
 MED_BRIGHTNESS = 100
 HIGH_BRIGHTNESS = 255
 MID_BRIGHTNESS = 155
 
+GRADIENT_EXPAND_CACHE_SIZE = 8
+
+
+def covers_strip(builder):
+    """Marks the animations a builder makes as setting every pixel before
+    their first frame, so what they show doesn't depend on what the strip
+    was showing before. Strips of the same kind can share their frames
+    (see ledtools.Strips) and they can be baked."""
+    @wraps(builder)
+    def with_marker(*args, **kwargs):
+        animation = builder(*args, **kwargs)
+        animation.covers_strip = True
+        return animation
+
+    return with_marker
+
+
+def draws_over(animation):
+    """True if what an animation shows can depend on what was on the strip
+    before it started, anything not marked with covers_strip."""
+    return not getattr(animation, 'covers_strip', False)
+
 
 def chain(functions):
     def with_strip(strip):
@@ -37,9 +65,14 @@ def chain(functions):
             for x in function(strip):
                 yield x
 
+    # Covers the strip if the first one does
+    if functions and not draws_over(functions[0]):
+        with_strip.covers_strip = True
+
     return with_strip
 
 
+@covers_strip
 def flash(color):
     def with_strip(strip):
         for x in strip.flash_for([color], BETWEEN_STRIP_CHANGES_SLOW, n=1):
@@ -48,6 +81,7 @@ def flash(color):
     return with_strip
 
 
+@covers_strip
 def flash_then_on(from_color, flash_freq, to_color, to_brightness, to_seconds):
     def with_strip(strip):
         for x in strip.flash_for([from_color], BETWEEN_STRIP_CHANGES_SLOW, n=flash_freq):
@@ -59,6 +93,7 @@ def flash_then_on(from_color, flash_freq, to_color, to_brightness, to_seconds):
     return with_strip
 
 
+@covers_strip
 def on(color, for_seconds):
     def with_strip(strip):
         for x in strip.on(color, for_seconds):
@@ -67,6 +102,7 @@ def on(color, for_seconds):
     return with_strip
 
 
+@covers_strip
 def color_swipe_to_color(start_color, start_seconds, swipe_color, swipe_speed, end_color, end_seconds):
     def with_strip(strip):
         for x in strip.on(start_color, start_seconds):
@@ -81,6 +117,7 @@ def color_swipe_to_color(start_color, start_seconds, swipe_color, swipe_speed, e
     return with_strip
 
 
+@covers_strip
 def flicker_then_on(from_color, flicker_seconds, to_color, to_brightness, to_seconds):
     def with_strip(strip):
         for x in strip.flash_for([from_color], BETWEEN_LED_CHANGES_SLOW, brightness=50, seconds=flicker_seconds):
@@ -92,6 +129,7 @@ def flicker_then_on(from_color, flicker_seconds, to_color, to_brightness, to_sec
     return with_strip
 
 
+@covers_strip
 def flash_for_seconds(colors, seconds):
     def with_strip(strip):
         for x in strip.flash_for(colors, BETWEEN_STRIP_CHANGES_SLOW, seconds=seconds):
@@ -100,6 +138,7 @@ def flash_for_seconds(colors, seconds):
     return with_strip
 
 
+@covers_strip
 def low_to_high_brightness(color, start_brightness, start_seconds, end_brightness, end_seconds):
     def with_strip(strip):
         for x in strip.on(color, start_seconds, start_brightness):
@@ -114,6 +153,7 @@ def low_to_high_brightness(color, start_brightness, start_seconds, end_brightnes
     return with_strip
 
 
+@covers_strip
 def low_to_high_flicker(color, low_brightness, high_brightness):
     def with_strip(strip):
         for x in strip.on(color, 0, low_brightness):
@@ -125,9 +165,12 @@ def low_to_high_flicker(color, low_brightness, high_brightness):
     return with_strip
 
 
-def rainbow_wipe(colors):
+# The chunk and count arguments below posterize the pixels (see
+# colortools.posterize), runs of chunk LEDs and at most count colours.
+
+def rainbow_wipe(colors, chunk=1, count=None):
     def with_strip(strip):
-        pixels = colortools.rainbow(strip.length, colors)
+        pixels = colortools.posterize(colortools.rainbow(strip.length, colors), chunk, count)
 
         for x in strip.wipe(pixels, BETWEEN_LED_CHANGES_FAST):
             yield x
@@ -135,9 +178,10 @@ def rainbow_wipe(colors):
     return with_strip
 
 
-def strip_length_cycle(pixels):
+@covers_strip
+def strip_length_cycle(pixels, chunk=1, count=None):
     def with_strip(strip):
-        generator = strip.cycle(pixels(strip.length), BETWEEN_LED_CHANGES_FAST)
+        generator = strip.cycle(colortools.posterize(pixels(strip.length), chunk, count), BETWEEN_LED_CHANGES_FAST)
 
         for idx in range(strip.length * 2):
             yield next(generator)
@@ -145,7 +189,10 @@ def strip_length_cycle(pixels):
     return with_strip
 
 
-def cycle(pixels):
+@covers_strip
+def cycle(pixels, chunk=1, count=None):
+    pixels = colortools.posterize(pixels, chunk, count)
+
     def with_strip(strip):
         generator = strip.cycle(pixels, BETWEEN_LED_CHANGES_FAST)
 
@@ -155,18 +202,74 @@ def cycle(pixels):
     return with_strip
 
 
+class GradientExpandFrames:
+    """Frames of a gradient_expand, each worked out the first time a strip
+    gets to it and kept for the next strip or the next time it plays.
+
+    Only the packed values are kept (a few hundred KB for a whole
+    animation), strips that aren't packed get their colours worked out
+    again every time.
+
+    """
+    def __init__(self, length, end_color, middle_color, chunk=1, count=None):
+        self.length = length
+        self.end_color = end_color
+        self.middle_color = middle_color
+        self.chunk = max(chunk, 1)
+        self.count = count
+        self.frames = []
+
+    def __len__(self):
+        return ceil(self.length / 2)
+
+    def scale(self, idx):
+        return colortools.Scale([
+            (self.end_color, -1),
+            (self.middle_color, (self.length // 2) - idx),
+            (self.middle_color, (self.length // 2) + idx),
+            (self.end_color, self.length),
+        ])
+
+    def pixels(self, idx):
+        return colortools.posterize(self.scale(idx).between(0, self.length, self.chunk), 1, self.count)
+
+    def values(self, idx):
+        """Packed frame *idx*, shared between strips so don't modify it!"""
+        while len(self.frames) <= idx:
+            self.frames.append(self.pack(len(self.frames)))
+
+        return self.frames[idx]
+
+    def pack(self, idx):
+        # Limiting the colours needs colour.Color objects, otherwise numpy
+        # gives the same values a lot quicker
+        if self.count is not None:
+            return array('I', map(colortools.pack_uncached, self.pixels(idx)))
+
+        rgb = self.scale(idx).between_array(0, self.length)
+        rgb = rgb[numpy.arange(len(rgb)) // self.chunk * self.chunk]
+        return array('I', colortools.pack_array(rgb).astype(numpy.uint32).tobytes())
+
+
+# colour.Color isn't hashable so the cache is keyed on hsl instead
+@lru_cache(maxsize=GRADIENT_EXPAND_CACHE_SIZE)
+def gradient_expand_frames(length, end_hsl, middle_hsl, chunk=1, count=None):
+    return GradientExpandFrames(length, colour.Color(hsl=end_hsl), colour.Color(hsl=middle_hsl), chunk, count)
+
+
 # test
-def gradient_expand(end_color, middle_color):
+@covers_strip
+def gradient_expand(end_color, middle_color, chunk=1, count=None):
     def with_strip(strip):
-        for idx in range(ceil(strip.length / 2)):
-            pixels = colortools.Scale([
-                (end_color, -1),
-                (middle_color, (strip.length // 2) - idx),
-                (middle_color, (strip.length // 2) + idx),
-                (end_color, strip.length),
-            ])
-
-            for x in strip.gradient(pixels.between(0, strip.length), BETWEEN_LED_CHANGES_FAST):
+        frames = gradient_expand_frames(strip.length, end_color.hsl, middle_color.hsl, chunk, count)
+
+        for idx in range(len(frames)):
+            if strip.packed:
+                generator = strip.gradient(None, BETWEEN_LED_CHANGES_FAST, values=frames.values(idx))
+            else:
+                generator = strip.gradient(frames.pixels(idx), BETWEEN_LED_CHANGES_FAST)
+
+            for x in generator:
                 yield x
 
     return with_strip
@@ -344,27 +447,27 @@ animations = {
 
 
 if __name__ == '__main__':
-    length = input("📎 \033[94mPlease enter led length:\033[0m ")
-    leds = ledtools.Strip(None, int(length), PINK, 255)
-    animator = ledtools.Strips([leds])
+    import sys
+    import preview
+    import render
+
+    length = int(input("📎 \033[94mPlease enter led length:\033[0m "))
+    count = int(input("📎 \033[94mHow many strips? (1):\033[0m ") or 1)
+    terminal = preview.Terminal(gamma=colortools.GAMMA if '--gamma' in sys.argv[1:] else 1)
+    strips = [ledtools.Strip(terminal.strip(length), length, PINK, 255, rle=True) for _ in range(count)]
+    animator = ledtools.Strips(strips)
+
+    # Same scheduler as the Pi, so animations run at the speed they would there
+    frame_scheduler = scheduler.Scheduler(drop_late=True)
 
     while True:
         cmd = input('✨ \033[94mNext:\033[0m ')
-        print('', end='\r')
-
         animation = animations.get(int(cmd))
 
         if animation is not None:
-            for ms in animator.animate(animation):
-                brightness = leds.brightness / 255
-                output = ""
-
-                for pixel in leds.pixels:
-                    color = colour.Color(hsl=(pixel.hue, pixel.saturation, pixel.luminance * brightness))
-                    output += f'\033[38;2;{int(color.red * 255)};{int(color.green * 255)};{int(color.blue * 255)}m'
-                    output += "◼︎"
-                    output += '\033[0m'
+            terminal.start()
 
-                print(output, end='\r')
-                time.sleep(ms/1000)
+            for ms in frame_scheduler.schedule(animator.animate(animation)):
+                render.update(strips)
 
+            terminal.end()
@@ -0,0 +1,168 @@
+import argparse
+import time
+import tracemalloc
+from array import array
+
+import animatetools
+import ledtools
+import render
+
+
+# Same as main.py, which can't be imported off the Pi
+LED_COUNT = 290
+STRIP_COUNT = 2
+
+# WS2812 timings, 24 bits at 800khz per pixel and the reset/latch time
+PIXEL_US = 30
+LATCH_US = 300
+
+
+class FakePixelStrip:
+    """Stands in for rpi_ws281x.PixelStrip, counts calls and how long the
+    data would have taken to go down the wire."""
+    def __init__(self, length, sleep=False):
+        self.pixels = array('I', [0]) * length
+        self.brightness = 255
+        self.sleep = sleep
+        self.set_pixel_calls = 0
+        self.set_brightness_calls = 0
+        self.show_calls = 0
+        self.wire_us = 0
+
+    def numPixels(self):
+        return len(self.pixels)
+
+    def setPixelColor(self, n, color):
+        self.set_pixel_calls += 1
+        self.pixels[n] = color
+
+    def setBrightness(self, brightness):
+        self.set_brightness_calls += 1
+        self.brightness = brightness
+
+    def show(self):
+        self.show_calls += 1
+        wire_us = len(self.pixels) * PIXEL_US + LATCH_US
+        self.wire_us += wire_us
+
+        if self.sleep:
+            time.sleep(wire_us / 1000000)
+
+
+
+class Result:
+    def __init__(self, name):
+        self.name = name
+        self.frames = 0
+        self.cpu_ns = 0
+        self.wire_us = 0
+        self.allocated = 0
+        self.set_pixel_calls = 0
+        self.show_calls = 0
+        self.nominal_ms = 0
+        self.effective_ms = 0
+
+    def fps(self):
+        seconds = (self.cpu_ns / 1000000000) + (self.wire_us / 1000000)
+        return self.frames / seconds if seconds else 0
+
+    def cpu_ms_per_frame(self):
+        return self.cpu_ns / 1000000 / max(self.frames, 1)
+
+    def allocated_per_frame(self):
+        return self.allocated / max(self.frames, 1)
+
+
+
+def make_strips(length=LED_COUNT, strip_count=STRIP_COUNT, packed=True, rle=False):
+    return ledtools.Strips([
+        ledtools.Strip(FakePixelStrip(length), length, animatetools.BLACK, 255, packed=packed, rle=rle)
+        for _ in range(strip_count)
+    ])
+
+
+def bench(name, animation, strips, allocations=False):
+    """Runs an animation through Strips.animate and render.update as fast as
+    it can, without sleeping between frames."""
+    result = Result(name)
+    strip_list = list(strips)
+    frames = strips.animate(animation)
+
+    if allocations:
+        tracemalloc.start()
+
+    try:
+        while True:
+            # Forgets what's traced so far and the peak with it, reset_peak()
+            # would keep the traces but isn't there before python 3.9
+            if allocations:
+                tracemalloc.clear_traces()
+
+            wire_before = sum(leds.strip.wire_us for leds in strip_list)
+            start = time.process_time_ns()
+
+            try:
+                ms = next(frames)
+            except StopIteration:
+                break
+
+            render.update(strip_list)
+            cpu_ns = time.process_time_ns() - start
+            wire_us = sum(leds.strip.wire_us for leds in strip_list) - wire_before
+
+            if allocations:
+                _, peak = tracemalloc.get_traced_memory()
+                result.allocated += peak
+
+            result.frames += 1
+            result.cpu_ns += cpu_ns
+            result.wire_us += wire_us
+            result.nominal_ms += ms
+            # A frame can't be shown for less time than it takes to make it
+            result.effective_ms += max(ms, cpu_ns / 1000000 + wire_us / 1000)
+
+    finally:
+        if allocations:
+            tracemalloc.stop()
+
+    result.set_pixel_calls = sum(leds.strip.set_pixel_calls for leds in strip_list)
+    result.show_calls = sum(leds.strip.show_calls for leds in strip_list)
+    return result
+
+
+def report(results, allocations=False):
+    header = f'{"animation":>9} {"frames":>7} {"fps":>9} {"cpu ms/frame":>13} {"setPixel":>9} {"show":>6} {"nominal s":>10} {"effective s":>12}'
+
+    if allocations:
+        header += f' {"bytes/frame":>12}'
+
+    print(header)
+
+    for result in results:
+        line = f'{str(result.name):>9} {result.frames:>7} {result.fps():>9.1f} {result.cpu_ms_per_frame():>13.3f} {result.set_pixel_calls:>9} {result.show_calls:>6} {result.nominal_ms / 1000:>10.2f} {result.effective_ms / 1000:>12.2f}'
+
+        if allocations:
+            line += f' {result.allocated_per_frame():>12.0f}'
+
+        print(line)
+
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark animations without the Pi')
+    parser.add_argument('animations', nargs='*', type=int, help='animation numbers, all of them if none are given')
+    parser.add_argument('--length', type=int, default=LED_COUNT)
+    parser.add_argument('--strips', type=int, default=STRIP_COUNT)
+    parser.add_argument('--unpacked', action='store_true', help='use colour.Color pixels instead of a packed buffer')
+    parser.add_argument('--spans', action='store_true', help='keep pixels as run length encoded spans')
+    parser.add_argument('--allocations', action='store_true', help='also measure memory allocated per frame (slower)')
+    args = parser.parse_args()
+
+    nums = args.animations or list(animatetools.animations.keys())
+    results = []
+
+    for num in nums:
+        strips = make_strips(args.length, args.strips, packed=not args.unpacked, rle=args.spans)
+        results.append(bench(num, animatetools.animations[num], strips, args.allocations))
+
+    report(results, args.allocations)
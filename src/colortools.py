@@ -1,5 +1,18 @@
 import colour
 from math import ceil
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy
+
+
+WHITE = colour.Color("white")
+PALETTE_SIZE = 256
+
+# LEDs look much brighter than their duty cycle at the low end, channels go
+# through this curve so brightness ramps look even
+GAMMA = 2.2
 
 
 def first_true(iterable, default=False, pred=None):
@@ -17,6 +30,108 @@ def first_true(iterable, default=False, pred=None):
 
 
 
+def pack(color):
+    return palette.pack(color)
+
+
+
+def pack_uncached(color):
+    """Packs a colour into the 32 bit word rpi_ws281x.Color would give.
+
+    White is sent on the white channel as well as red, green and blue.
+
+    """
+    if color == WHITE:
+        return 0xFFFFFFFF
+
+    red, green, blue = color.rgb
+    return (int(255 * red) << 16) | (int(255 * green) << 8) | int(255 * blue)
+
+
+
+def unpack(value):
+    if value >> 24:
+        return colour.Color(WHITE)
+
+    return colour.Color(rgb=((value >> 16 & 255) / 255, (value >> 8 & 255) / 255, (value & 255) / 255))
+
+
+
+class Palette:
+    """Remembers packed values so each colour only does the float maths once.
+
+    colour.Color isn't hashable so colours are keyed on their hsl, which is
+    what they store internally. Colours added up front are kept forever,
+    anything else (like the in-between colours from Scale.choose) goes in a
+    least recently used cache of *size* colours.
+
+    """
+    def __init__(self, colors=(), size=PALETTE_SIZE):
+        self.fixed = {}
+        self.recent = OrderedDict()
+        self.size = size
+        self.add(colors)
+
+    def add(self, colors):
+        for color in colors:
+            self.fixed[color.hsl] = pack_uncached(color)
+
+    def pack(self, color):
+        key = color.hsl
+        value = self.fixed.get(key)
+
+        if value is not None:
+            return value
+
+        value = self.recent.get(key)
+
+        if value is None:
+            value = pack_uncached(color)
+            self.recent[key] = value
+
+            if len(self.recent) > self.size:
+                self.recent.popitem(last=False)
+
+        else:
+            self.recent.move_to_end(key)
+
+        return value
+
+
+
+palette = Palette([WHITE])
+
+
+
+@lru_cache(maxsize=None)
+def gamma_table(gamma=GAMMA):
+    """256 corrected channel values, rpi_ws281x.PixelStrip takes this as
+    gamma= and applies it on the Pi."""
+    return [int(round(255 * (channel / 255) ** gamma)) for channel in range(256)]
+
+
+
+@lru_cache(maxsize=None)
+def brightness_table(gamma=GAMMA):
+    """Every channel at every brightness, table[brightness << 8 | channel].
+
+    Worked out the same way rpi_ws281x does (scale then gamma correct), so
+    what's drawn off the Pi matches the strips.
+
+    """
+    gammas = gamma_table(gamma)
+    return bytes(gammas[(channel * (brightness + 1)) >> 8] for brightness in range(256) for channel in range(256))
+
+
+
+def dim(value, brightness, gamma=GAMMA):
+    """A packed colour at *brightness*, gamma corrected."""
+    table = brightness_table(gamma)
+    row = brightness << 8
+    return (table[row | value >> 24] << 24) | (table[row | (value >> 16 & 255)] << 16) | (table[row | (value >> 8 & 255)] << 8) | table[row | (value & 255)]
+
+
+
 def rainbow(min_length, colors):
     segment = ceil(min_length / len(colors))
     # In cases where the colors don't divide perfectly into the strip, this
@@ -32,16 +147,181 @@ def rainbow(min_length, colors):
 
 
 
-def gradient(length, from_color, to_color):
+def rainbow_array(min_length, colors):
+    """Same as rainbow, as an (N, 3) uint8 array of red, green, blue."""
+    segment = ceil(min_length / len(colors))
+    return numpy.repeat(to_array(colors), segment, axis=0)
+
+
+
+def gradient(length, from_color, to_color, chunk=1):
     scale = Scale([(from_color, 0), (to_color, length - 1)])
-    return scale.between(0, length - 1)
+    return scale.between(0, length - 1, chunk)
+
+
+
+def chunked(colors, size):
+    """Every *size* LEDs in a row take the colour of the first of them.
+
+    A pattern of runs only changes at the edges of each run when it moves,
+    so cycling it sets about len(colors) / size pixels a frame.
+
+    """
+    if size <= 1:
+        return list(colors)
+
+    return [colors[i - i % size] for i in range(len(colors))]
+
+
+
+def distance(a, b):
+    return sum((x - y) ** 2 for x, y in zip(a.rgb, b.rgb))
+
+
+
+def limited(colors, count):
+    """Maps every colour onto the closest of *count* colours, picked evenly
+    from the distinct colours in the order they first appear."""
+    distinct = list(OrderedDict((color.hsl, color) for color in colors).values())
+
+    if len(distinct) <= count:
+        return list(colors)
+
+    if count == 1:
+        chosen = distinct[:1]
+    else:
+        chosen = [distinct[round(i * (len(distinct) - 1) / (count - 1))] for i in range(count)]
+
+    closest = {}
+    result = []
+
+    for color in colors:
+        key = color.hsl
+
+        if key not in closest:
+            closest[key] = min(chosen, key=lambda choice: distance(choice, color))
+
+        result.append(closest[key])
+
+    return result
+
+
+
+def posterize(colors, chunk=1, count=None):
+    """Cuts a row of colours down to runs of *chunk* LEDs and at most *count*
+    different colours, fewer changes means faster frames."""
+    if count is not None:
+        colors = limited(colors, count)
+
+    return chunked(colors, chunk)
+
+
+
+def gradient_array(length, from_color, to_color):
+    """Same as gradient, as an (N, 3) uint8 array of red, green, blue."""
+    scale = Scale([(from_color, 0), (to_color, length - 1)])
+    return scale.between_array(0, length - 1)
+
+
+
+def to_array(colors):
+    """Colours as an (N, 3) uint8 array, channels truncated like pack."""
+    rgb = numpy.array([color.rgb for color in colors], dtype=float).reshape(-1, 3)
+    return to_bytes(rgb)
+
+
+
+def to_bytes(rgb):
+    # Same as int(255 * channel) in pack_uncached
+    return (rgb * 255).astype(numpy.uint8)
+
+
+
+def hue_to_rgb(v1, v2, hue):
+    hue = numpy.where(hue < 0, hue + 1, hue)
+    hue = numpy.where(hue > 1, hue - 1, hue)
+
+    return numpy.select(
+        [6 * hue < 1, 2 * hue < 1, 3 * hue < 2],
+        [v1 + (v2 - v1) * 6 * hue, v2, v1 + (v2 - v1) * ((2.0 / 3) - hue) * 6],
+        v1,
+    )
+
+
+
+def through_hsl(rgb):
+    """What colour.Color(rgb=...).rgb gives for every row of an (N, 3)
+    float array. Colours are stored as hsl, so going through it changes
+    the last bits of the channels and that can change what they truncate
+    to. This is colour's rgb2hsl and hsl2rgb with the same float maths.
+
+    """
+    red, green, blue = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    vmin = numpy.minimum(numpy.minimum(red, green), blue)
+    vmax = numpy.maximum(numpy.maximum(red, green), blue)
+    diff = vmax - vmin
+    vsum = vmin + vmax
+    lightness = vsum / 2
+    gray = diff < colour.FLOAT_ERROR
+
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        saturation = numpy.where(gray, 0.0, numpy.where(lightness < 0.5, diff / vsum, diff / (2.0 - vsum)))
+        dr = (((vmax - red) / 6) + (diff / 2)) / diff
+        dg = (((vmax - green) / 6) + (diff / 2)) / diff
+        db = (((vmax - blue) / 6) + (diff / 2)) / diff
+
+    hue = numpy.where(red == vmax, db - dg, numpy.where(green == vmax, (1.0 / 3) + dr - db, (2.0 / 3) + dg - dr))
+    hue = numpy.where(hue < 0, hue + 1, hue)
+    hue = numpy.where(hue > 1, hue - 1, hue)
+    hue = numpy.where(gray, 0.0, hue)
+
+    v2 = numpy.where(lightness < 0.5, lightness * (1.0 + saturation), (lightness + saturation) - (saturation * lightness))
+    v1 = 2.0 * lightness - v2
+    result = numpy.stack([
+        hue_to_rgb(v1, v2, hue + (1.0 / 3)),
+        hue_to_rgb(v1, v2, hue),
+        hue_to_rgb(v1, v2, hue - (1.0 / 3)),
+    ], axis=1)
+
+    return numpy.where((saturation == 0)[:, None], lightness[:, None], result)
+
+
+
+def pack_array(rgb):
+    """Packs an (N, 3) uint8 array the same way pack does, white included."""
+    rgb = rgb.astype(numpy.uint32)
+    values = (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+    values[values == 0xFFFFFF] = 0xFFFFFFFF
+    return values
 
 
 
 class Scale:
     """ stops: ( red, 5 ), ( orange, 11 ), ( yellow, 16 ), ( green, 22 ) """
     def __init__(self, stops):
-        self.stops = sorted(stops, key=lambda tup: tup[1])
+        self.stops = stops
+
+    @property
+    def stops(self):
+        return self._stops
+
+    @stops.setter
+    def stops(self, stops):
+        # A tuple so the stops can only change by setting them again, which
+        # throws the lookup table away
+        self._stops = tuple(sorted(stops, key=lambda tup: tup[1]))
+        self.lut = None
+
+    def lookup(self, num):
+        """Packed colour of choose(bucket(num)), from a table of every int
+        between the first and last stop that's built the first time it's
+        needed."""
+        first = self.stops[0][1]
+
+        if self.lut is None:
+            self.lut = array('I', [pack_uncached(self.choose(num)) for num in range(first, self.stops[-1][1] + 1)])
+
+        return self.lut[self.bucket(num) - first]
 
     def choose(self, num):
         lower_bound = first_true(reversed(self.stops), default=None, pred=lambda tup: num >= tup[1])
@@ -69,14 +349,57 @@ class Scale:
             print(f'Error finding a colour for stop {num}')
             return RED # Error
 
-    def between(self, begin_num, end_num):
+    def bucket(self, num):
+        """Numbers in the same bucket are the same colour when they're made
+        into ints for choose."""
+        return min(max(int(num), self.stops[0][1]), self.stops[-1][1])
+
+    def between(self, begin_num, end_num, chunk=1):
+        """Colours from begin_num to end_num. With *chunk* only every
+        chunk-th colour is worked out and repeated, same as chunked()."""
+        chunk = max(chunk, 1)
         all_colors = []
 
         for num in range(begin_num, end_num + 1):
-            all_colors.append(self.choose(num))
+            if (num - begin_num) % chunk == 0:
+                color = self.choose(num)
+
+            all_colors.append(color)
 
         return all_colors
 
+    def choose_array(self, nums):
+        """Same as choose for every number in nums at once.
+
+        Returns an (N, 3) uint8 array of red, green, blue.
+
+        """
+        nums = numpy.asarray(nums, dtype=float)
+        positions = numpy.array([stop[1] for stop in self.stops], dtype=float)
+        colors = numpy.array([stop[0].rgb for stop in self.stops], dtype=float)
+        last = len(self.stops) - 1
+
+        # Same bounds choose finds, the last stop at or below each number and
+        # the first stop at or above it. Outside the scale both ends become
+        # the closest stop.
+        lower = numpy.searchsorted(positions, nums, side='right') - 1
+        upper = numpy.searchsorted(positions, nums, side='left')
+        lower = numpy.where(lower < 0, 0, lower)
+        upper = numpy.where(upper > last, last, upper)
+
+        span = positions[upper] - positions[lower]
+        mult = numpy.divide(nums - positions[lower], span, out=numpy.zeros_like(nums), where=span != 0)
+        rgb = colors[lower] + mult[:, None] * (colors[upper] - colors[lower])
+
+        # choose gives the stop itself when there's nothing to interpolate,
+        # anything in between is a new colour.Color
+        rgb = numpy.where((span == 0)[:, None], colors[lower], through_hsl(rgb))
+
+        return to_bytes(rgb)
+
+    def between_array(self, begin_num, end_num):
+        return self.choose_array(numpy.arange(begin_num, end_num + 1))
+
 
 
 
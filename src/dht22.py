@@ -1,28 +1,25 @@
 import time
 import RPi
 
-
-# https://github.com/szazo/DHT11_Python/pull/11/files
+import dht22decode
+from dht22decode import DHT22Result
 
 
-class DHT22Result:
-    'DHT22 sensor result returned by DHT22.read() method'
+# https://github.com/szazo/DHT11_Python/pull/11/files
 
-    ERR_NO_ERROR = 0
-    ERR_MISSING_DATA = 1
-    ERR_CRC = 2
 
-    error_code = ERR_NO_ERROR
-    temperature = -1
-    humidity = -1
+# Ways of capturing the sensor's response
+POLL = 'poll'
+EDGES = 'edges'
 
-    def __init__(self, error_code, temperature, humidity):
-        self.error_code = error_code
-        self.temperature = temperature
-        self.humidity = humidity
+# The whole response takes about 5ms
+EDGE_CAPTURE_SECONDS = 0.01
 
-    def is_valid(self):
-        return self.error_code == DHT22Result.ERR_NO_ERROR
+# Edge capture is given up on after this many bad reads in a row. Edges are
+# timestamped in RPi.GPIO's callback thread, after the pin has already been
+# switched to input, so it can miss the start of the response or not tell a
+# 26us pulse from a 70us one. It hasn't been proven on the Pi yet.
+MAX_EDGE_FAILURES = 3
 
 
 class DHT22:
@@ -30,8 +27,10 @@ class DHT22:
 
     __pin = 0
 
-    def __init__(self, pin):
+    def __init__(self, pin, capture=POLL):
         self.__pin = pin
+        self.capture = capture
+        self.edge_failures = 0
 
     def read(self):
         RPi.GPIO.setup(self.__pin, RPi.GPIO.OUT)
@@ -45,38 +44,46 @@ class DHT22:
         # change to input using pull up
         RPi.GPIO.setup(self.__pin, RPi.GPIO.IN, RPi.GPIO.PUD_UP)
 
-        # collect data into an array
-        data = self.__collect_input()
-
-        # parse lengths of all data pull up periods
-        pull_up_lengths = self.__parse_data_pull_up_lengths(data)
+        if self.capture == EDGES:
+            try:
+                result = dht22decode.decode_edges(self.__collect_edges())
+            except RuntimeError as error:
+                # edge detection isn't available, poll from now on
+                print(f'Falling back to polling the DHT22: {error}')
+                self.capture = POLL
+                return dht22decode.DHT22Result(dht22decode.DHT22Result.ERR_MISSING_DATA, 0, 0)
 
-        # if bit count mismatch, return error (4 byte data + 1 byte checksum)
-        if len(pull_up_lengths) != 40:
-            return DHT22Result(DHT22Result.ERR_MISSING_DATA, 0, 0)
+            self.edge_failures = 0 if result.is_valid() else self.edge_failures + 1
 
-        # calculate bits from lengths of the pull up periods
-        bits = self.__calculate_bits(pull_up_lengths)
+            if self.edge_failures >= MAX_EDGE_FAILURES:
+                print(f'Falling back to polling the DHT22 after {self.edge_failures} bad reads from edges')
+                self.capture = POLL
 
-        # we have the bits, calculate bytes
-        the_bytes = self.__bits_to_bytes(bits)
+            return result
 
-        # calculate checksum and check
-        checksum = self.__calculate_checksum(the_bytes)
-        if the_bytes[4] != checksum:
-            return DHT22Result(DHT22Result.ERR_CRC, 0, 0)
-
-        # ok, we have valid data, return it
-        temp = (the_bytes[2]*256+the_bytes[3])/10.0
-        if the_bytes[2]>127:
-            temp = temp - 256*256/10.
-        humid = (the_bytes[0]*256+the_bytes[1])/10.0
-        return DHT22Result(DHT22Result.ERR_NO_ERROR, temp, humid)
+        # collect data into a buffer and decode it
+        return dht22decode.decode(self.__collect_input())
 
     def __send_and_sleep(self, output, sleep):
         RPi.GPIO.output(self.__pin, output)
         time.sleep(sleep)
 
+    def __collect_edges(self):
+        # timestamp every edge from an interrupt instead of polling
+        edges = []
+
+        def on_edge(channel):
+            edges.append((time.perf_counter_ns(), RPi.GPIO.input(channel)))
+
+        RPi.GPIO.add_event_detect(self.__pin, RPi.GPIO.BOTH, callback=on_edge)
+
+        try:
+            time.sleep(EDGE_CAPTURE_SECONDS)
+        finally:
+            RPi.GPIO.remove_event_detect(self.__pin)
+
+        return edges
+
     def __collect_input(self):
         # collect the data while unchanged found
         unchanged_count = 0
@@ -85,7 +92,7 @@ class DHT22:
         max_unchanged_count = 100
 
         last = -1
-        data = []
+        data = bytearray()
         while True:
             current = RPi.GPIO.input(self.__pin)
             data.append(current)
@@ -98,103 +105,3 @@ class DHT22:
                     break
 
         return data
-
-    def __parse_data_pull_up_lengths(self, data):
-        STATE_INIT_PULL_DOWN = 1
-        STATE_INIT_PULL_UP = 2
-        STATE_DATA_FIRST_PULL_DOWN = 3
-        STATE_DATA_PULL_UP = 4
-        STATE_DATA_PULL_DOWN = 5
-
-        state = STATE_INIT_PULL_DOWN
-
-        lengths = [] # will contain the lengths of data pull up periods
-        current_length = 0 # will contain the length of the previous period
-
-        for i in range(len(data)):
-
-            current = data[i]
-            current_length += 1
-
-            if state == STATE_INIT_PULL_DOWN:
-                if current == RPi.GPIO.LOW:
-                    # ok, we got the initial pull down
-                    state = STATE_INIT_PULL_UP
-                    continue
-                else:
-                    continue
-            if state == STATE_INIT_PULL_UP:
-                if current == RPi.GPIO.HIGH:
-                    # ok, we got the initial pull up
-                    state = STATE_DATA_FIRST_PULL_DOWN
-                    continue
-                else:
-                    continue
-            if state == STATE_DATA_FIRST_PULL_DOWN:
-                if current == RPi.GPIO.LOW:
-                    # we have the initial pull down, the next will be the data pull up
-                    state = STATE_DATA_PULL_UP
-                    continue
-                else:
-                    continue
-            if state == STATE_DATA_PULL_UP:
-                if current == RPi.GPIO.HIGH:
-                    # data pulled up, the length of this pull up will determine whether it is 0 or 1
-                    current_length = 0
-                    state = STATE_DATA_PULL_DOWN
-                    continue
-                else:
-                    continue
-            if state == STATE_DATA_PULL_DOWN:
-                if current == RPi.GPIO.LOW:
-                    # pulled down, we store the length of the previous pull up period
-                    lengths.append(current_length)
-                    state = STATE_DATA_PULL_UP
-                    continue
-                else:
-                    continue
-
-        return lengths
-
-    def __calculate_bits(self, pull_up_lengths):
-        # find shortest and longest period
-        shortest_pull_up = 1000
-        longest_pull_up = 0
-
-        for i in range(0, len(pull_up_lengths)):
-            length = pull_up_lengths[i]
-            if length < shortest_pull_up:
-                shortest_pull_up = length
-            if length > longest_pull_up:
-                longest_pull_up = length
-
-        # use the halfway to determine whether the period it is long or short
-        halfway = shortest_pull_up + (longest_pull_up - shortest_pull_up) / 2
-        bits = []
-
-        for i in range(0, len(pull_up_lengths)):
-            bit = False
-            if pull_up_lengths[i] > halfway:
-                bit = True
-            bits.append(bit)
-
-        return bits
-
-    def __bits_to_bytes(self, bits):
-        the_bytes = []
-        byte = 0
-
-        for i in range(0, len(bits)):
-            byte = byte << 1
-            if (bits[i]):
-                byte = byte | 1
-            else:
-                byte = byte | 0
-            if ((i + 1) % 8 == 0):
-                the_bytes.append(byte)
-                byte = 0
-
-        return the_bytes
-
-    def __calculate_checksum(self, the_bytes):
-        return the_bytes[0] + the_bytes[1] + the_bytes[2] + the_bytes[3] & 255
\ No newline at end of file
@@ -0,0 +1,137 @@
+import numpy
+
+
+# Decodes what DHT22.read() captures from the sensor, tested with recorded
+# captures.
+
+LOW = 0
+HIGH = 1
+
+# 4 data bytes + 1 checksum byte
+BITS = 40
+
+# Data pull ups are 26-28us for a 0 and 70us for a 1
+ONE_PULL_UP_US = 50
+
+
+class DHT22Result:
+    'DHT22 sensor result returned by DHT22.read() method'
+
+    ERR_NO_ERROR = 0
+    ERR_MISSING_DATA = 1
+    ERR_CRC = 2
+
+    error_code = ERR_NO_ERROR
+    temperature = -1
+    humidity = -1
+
+    def __init__(self, error_code, temperature, humidity):
+        self.error_code = error_code
+        self.temperature = temperature
+        self.humidity = humidity
+
+    def is_valid(self):
+        return self.error_code == DHT22Result.ERR_NO_ERROR
+
+
+
+def runs(samples):
+    """Splits samples into runs, returns (levels, lengths) arrays."""
+    samples = numpy.frombuffer(bytes(samples), dtype=numpy.uint8)
+
+    if len(samples) == 0:
+        return samples, numpy.zeros(0, dtype=numpy.intp)
+
+    starts = numpy.concatenate(([0], numpy.flatnonzero(numpy.diff(samples)) + 1))
+    lengths = numpy.diff(numpy.append(starts, len(samples)))
+    return samples[starts], lengths
+
+
+def pull_up_lengths(samples):
+    """Lengths of the data pull up periods in a capture.
+
+    The capture starts with the sensor's initial pull down, pull up and
+    first data pull down, then every data bit is a pull up whose length
+    says if it's a 0 or a 1. A pull up only counts once the pull down
+    after it has started.
+
+    """
+    levels, lengths = runs(samples)
+    lows = numpy.flatnonzero(levels == LOW)
+
+    if len(lows) == 0:
+        return lengths[:0]
+
+    # Runs alternate so after the first low run there's the initial pull up
+    # and then the first data pull down
+    first_data = lows[0] + 3
+    data_levels = levels[first_data:-1]
+    data_lengths = lengths[first_data:-1]
+    return data_lengths[data_levels == HIGH]
+
+
+def to_bytes(pull_up_lengths):
+    # use the halfway between the shortest and longest pull ups to decide
+    # whether each one is long (1) or short (0)
+    shortest = pull_up_lengths.min()
+    longest = pull_up_lengths.max()
+    bits = pull_up_lengths > shortest + (longest - shortest) / 2
+    return numpy.packbits(bits).tolist()
+
+
+def checksum(the_bytes):
+    return the_bytes[0] + the_bytes[1] + the_bytes[2] + the_bytes[3] & 255
+
+
+def edge_pull_up_lengths(edges):
+    """Lengths in us of the pull ups in a list of (timestamp ns, level) edges.
+
+    Only the last BITS pull ups that have a pull down after them are data,
+    edges before them (or missed edges at the start) don't matter.
+
+    """
+    if len(edges) < 2:
+        return numpy.zeros(0)
+
+    edges = numpy.array(edges, dtype=numpy.int64)
+    timestamps = edges[:, 0]
+    levels = edges[:, 1]
+    pull_ups = (levels[:-1] == HIGH) & (levels[1:] == LOW)
+    lengths = (timestamps[1:] - timestamps[:-1])[pull_ups] / 1000
+    return lengths[-BITS:]
+
+
+def decode(samples):
+    """Turns a capture of GPIO readings (0s and 1s) into a DHT22Result."""
+    lengths = pull_up_lengths(samples)
+
+    # if bit count mismatch, return error (4 byte data + 1 byte checksum)
+    if len(lengths) != BITS:
+        return DHT22Result(DHT22Result.ERR_MISSING_DATA, 0, 0)
+
+    return from_bytes(to_bytes(lengths))
+
+
+def decode_edges(edges):
+    """Turns (timestamp ns, level) edges into a DHT22Result.
+
+    Pull ups are timed so bits don't depend on how fast anything polled.
+
+    """
+    lengths = edge_pull_up_lengths(edges)
+
+    if len(lengths) != BITS:
+        return DHT22Result(DHT22Result.ERR_MISSING_DATA, 0, 0)
+
+    return from_bytes(numpy.packbits(lengths > ONE_PULL_UP_US).tolist())
+
+
+def from_bytes(the_bytes):
+    if the_bytes[4] != checksum(the_bytes):
+        return DHT22Result(DHT22Result.ERR_CRC, 0, 0)
+
+    temp = (the_bytes[2]*256+the_bytes[3])/10.0
+    if the_bytes[2]>127:
+        temp = temp - 256*256/10.
+    humid = (the_bytes[0]*256+the_bytes[1])/10.0
+    return DHT22Result(DHT22Result.ERR_NO_ERROR, temp, humid)
@@ -0,0 +1,232 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from contextlib import closing
+
+import animatetools
+import ledtools
+
+
+# Baked animation files are a header followed by one record per frame:
+#
+#   header: magic, version, strip length, fingerprint of the source
+#   record: kind, brightness, number of runs, delay in ms
+#   run:    start pixel, pixel count, that many packed pixels
+#
+# A keyframe is a record with a single run covering the whole strip, any
+# other record only has runs for the pixels that changed since the frame
+# before. Brightness only frames have no runs at all, and frames that don't
+# change anything are added on to the delay of the record before them.
+#
+# The fingerprint is a hash of the files that decide what an animation draws
+# (see SOURCES), a file baked before any of them changed isn't played.
+#
+# Baking always starts from a black strip, so animations that draw over
+# whatever was there before (see animatetools.draws_over) are never
+# baked.
+#
+# Everything is in native byte order (little endian on the Pi and on anything
+# we'd bake on) and padded to 4 bytes so pixels can be read straight out of
+# the file as packed colours.
+MAGIC = b'LEDS'
+VERSION = 3
+HEADER = struct.Struct('<4sII8s')
+RECORD = struct.Struct('<BBHI')
+RUN = struct.Struct('<HH')
+EXTENSION = '.leds'
+
+KEYFRAME = 0
+DELTA = 1
+
+# Keyframes are written at least this often so a file can be seeked
+KEYFRAME_INTERVAL = 100
+
+SOURCES = ['animatetools.py', 'ledtools.py', 'colortools.py']
+
+# Unchanged pixels between two runs cost the same as starting a new run
+RUN_GAP = RUN.size // 4
+
+
+def bake(animation, length, file):
+    """Runs an animation on a virtual packed strip and writes every frame."""
+    if length > 0xFFFF:
+        raise ValueError(f'Can only bake strips up to {0xFFFF} pixels long')
+
+    leds = ledtools.Strip(None, length, animatetools.BLACK, 255, packed=True)
+    file.write(HEADER.pack(MAGIC, VERSION, length, fingerprint()))
+
+    record = None
+    since_keyframe = KEYFRAME_INTERVAL
+
+    for ms in animation(leds):
+        changed_pixels, _ = leds.changes()
+        leds.flush()
+
+        # Brightness can change and change back between frames
+        if record is not None and not changed_pixels and leds.brightness == record[2]:
+            record[1] += int(round(ms))
+            continue
+
+        if record is not None:
+            write_record(file, leds, *record)
+
+        runs = to_runs(changed_pixels)
+
+        if since_keyframe >= KEYFRAME_INTERVAL or sum(count for _, count in runs) + len(runs) >= length:
+            record = [KEYFRAME, int(round(ms)), leds.brightness, [(0, leds.buffer[:])]]
+            since_keyframe = 0
+
+        else:
+            record = [DELTA, int(round(ms)), leds.brightness, [(start, leds.buffer[start:start + count]) for start, count in runs]]
+
+        since_keyframe += 1
+
+    if record is not None:
+        write_record(file, leds, *record)
+
+
+def write_record(file, leds, kind, ms, brightness, runs):
+    file.write(RECORD.pack(kind, brightness, len(runs), ms))
+
+    for start, pixels in runs:
+        file.write(RUN.pack(start, len(pixels)))
+        file.write(pixels.tobytes())
+
+
+def to_runs(indices):
+    """Turns sorted pixel indices into (start, count) runs."""
+    runs = []
+
+    for i in indices:
+        if runs and i - sum(runs[-1]) <= RUN_GAP:
+            runs[-1] = (runs[-1][0], i - runs[-1][0] + 1)
+
+        else:
+            runs.append((i, 1))
+
+    return runs
+
+
+def bake_to_path(animation, length, path):
+    with open(path, 'wb') as file:
+        bake(animation, length, file)
+
+
+def fingerprint():
+    digest = hashlib.sha1()
+    directory = os.path.dirname(os.path.abspath(__file__))
+
+    for name in SOURCES:
+        with open(os.path.join(directory, name), 'rb') as file:
+            digest.update(file.read())
+
+    return digest.digest()[:HEADER.size - struct.calcsize('<4sII')]
+
+
+def is_current(path, length=None):
+    """True if the file was baked from the animations as they are now, and
+    for strips *length* pixels long if that's given."""
+    try:
+        with open(path, 'rb') as file:
+            magic, version, baked_length, baked_fingerprint = HEADER.unpack(file.read(HEADER.size))
+    except (OSError, struct.error):
+        return False
+
+    if length is not None and baked_length != length:
+        return False
+
+    return magic == MAGIC and version == VERSION and baked_fingerprint == fingerprint()
+
+
+def read_header(data):
+    magic, version, length, _ = HEADER.unpack_from(data, 0)
+
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('Not a baked animation file')
+
+    return length
+
+
+def read_records(data):
+    """Yields (ms, brightness, runs) for every record in a bytes like object.
+
+    runs are (start, pixels) where pixels is a view into data, it's only
+    valid until the next record is read.
+
+    """
+    read_header(data)
+    offset = HEADER.size
+
+    with memoryview(data) as view:
+        while offset < len(data):
+            kind, brightness, run_count, ms = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            runs = []
+
+            try:
+                for _ in range(run_count):
+                    start, count = RUN.unpack_from(data, offset)
+                    offset += RUN.size
+                    runs.append((start, view[offset:offset + count * 4].cast('I')))
+                    offset += count * 4
+
+                yield ms, brightness, runs
+
+            finally:
+                for _, pixels in runs:
+                    pixels.release()
+
+
+def play(strips, path):
+    """Same as Strips.animate, but for a baked animation file.
+
+    The strips have to be packed and the same length the file was baked for.
+
+    """
+    with open(path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            length = read_header(data)
+
+            for leds in strips:
+                if leds.length != length:
+                    raise ValueError(f'{path} was baked for {length} pixels, not {leds.length}')
+
+            # Closed before the mmap is, it can't be closed while the frame
+            # views still point into it
+            with closing(read_records(data)) as records:
+                for ms, brightness, runs in records:
+                    for leds in strips:
+                        leds.brightness = brightness
+
+                        for start, pixels in runs:
+                            leds.set_values(pixels, start)
+
+                    yield ms
+
+
+def baked_path(directory, num):
+    return os.path.join(directory, f'{num}{EXTENSION}')
+
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        print('Usage: python src/framefile.py <led length> <directory> [animation numbers...]')
+        sys.exit(1)
+
+    length = int(sys.argv[1])
+    directory = sys.argv[2]
+    nums = [int(num) for num in sys.argv[3:]] or list(animatetools.animations.keys())
+    os.makedirs(directory, exist_ok=True)
+
+    for num in nums:
+        path = baked_path(directory, num)
+
+        if animatetools.draws_over(animatetools.animations[num]):
+            print(f'Not baking animation {num}, it draws over what the strip was showing')
+            continue
+
+        print(f'Baking animation {num} to {path}')
+        bake_to_path(animatetools.animations[num], length, path)
@@ -1,43 +1,323 @@
 import colour
 import time
 from math import ceil
+from array import array
 import itertools
 
+import colortools
+import spans
+
 
 class Strips:
-    def __init__(self, led_strips):
+    def __init__(self, led_strips, share_frames=True):
         self.led_strips = led_strips
+        self.share_frames = share_frames
 
 
     def __iter__(self):
         return iter(self.led_strips)
 
 
+    def identical_groups(self, animation=None):
+        """Groups strips that an animation would do exactly the same thing to.
+
+        The first strip in each group is animated and the rest copy it.
+        Animations marked covers_strip (see animatetools.covers_strip) set
+        every pixel, so any strips of the same length and kind can share.
+        Anything else only shares between strips already showing the same
+        thing.
+
+        """
+        if not self.share_frames:
+            return [[leds] for leds in self.led_strips]
+
+        covers_strip = getattr(animation, 'covers_strip', False)
+        groups = []
+
+        for leds in self.led_strips:
+            for group in groups:
+                if group[0].same_kind(leds) if covers_strip else group[0].same_as(leds):
+                    group.append(leds)
+                    break
+
+            else:
+                groups.append([leds])
+
+        return groups
+
+
     def animate(self, animation):
         for leds in self.led_strips:
             leds.brightness = 255
 
-        for wait_ms in zip(*[animation(leds) for leds in self.led_strips]):
+        groups = self.identical_groups(animation)
+
+        for wait_ms in zip(*[animation(group[0]) for group in groups]):
+            for group in groups:
+                for leds in group[1:]:
+                    leds.copy_from(group[0])
+
             yield wait_ms[0]
 
 
 
 class Strip:
-    def __init__(self, strip, length, color, brightness=255):
+    def __init__(self, strip, length, color, brightness=255, packed=False, rle=False):
         self.strip = strip
-        self.pixels = [color] * length
-        self.brightness = brightness
         self.length = length
+        self.packed = packed or rle
+        self.rle = rle
+
+        # Packed strips hold colortools.pack values instead of colour.Color
+        # objects, colours are only converted when they are set or read back.
+        # rle strips are packed too but keep runs of the same colour as
+        # spans (see spans.py) instead of a value for every pixel.
+        if rle:
+            self.spans = spans.fill(length, colortools.pack(color))
+        elif packed:
+            self.buffer = array('I', [colortools.pack(color)]) * length
+        else:
+            self._pixels = [color] * length
+
+        self._brightness = brightness
+
+        # Everything is dirty until the first flush, we don't know what the
+        # physical strip is showing yet
+        self.changed_pixels = set(range(length))
+        self.brightness_changed = True
+
+        # Packed strips also remember what was there at the last flush, so
+        # pixels that changed and then changed back aren't pushed again.
+        # solid is the packed colour when the whole strip is one colour.
+        self.all_changed = False
+        self.solid = self.buffer[0] if packed and not rle and length else None
+        self.latched = None
+        self.latched_solid = None
+        self.latched_brightness = None
+
+
+    @property
+    def pixels(self):
+        if self.rle:
+            return [pixel for _, length, value in self.spans for pixel in [colortools.unpack(value)] * length]
+
+        if self.packed:
+            return [colortools.unpack(value) for value in self.buffer]
+
+        return self._pixels
+
+
+    @property
+    def brightness(self):
+        return self._brightness
+
+
+    @brightness.setter
+    def brightness(self, brightness):
+        if brightness != self._brightness:
+            self._brightness = brightness
+            self.brightness_changed = True
+
+
+    def values(self):
+        """Packed colour of every pixel, as a new array."""
+        if self.rle:
+            return spans.decode(self.spans)
+
+        if self.packed:
+            return self.buffer[:]
+
+        return array('I', map(colortools.pack, self._pixels))
+
+
+    def changes(self):
+        """Pixel indices and whether brightness changed since the last flush."""
+        if not self.packed:
+            return sorted(self.changed_pixels), self.brightness_changed
+
+        if self.rle:
+            changed_spans, brightness_changed = self.changed_spans()
+            return [i for start, length, _ in changed_spans for i in range(start, start + length)], brightness_changed
+
+        brightness_changed = self._brightness != self.latched_brightness
+
+        if self.latched is None:
+            return list(range(self.length)), brightness_changed
+
+        if self.solid is not None and self.latched_solid is not None:
+            changed_pixels = [] if self.solid == self.latched_solid else list(range(self.length))
+
+        elif self.all_changed:
+            changed_pixels = [] if self.buffer == self.latched else [i for i in range(self.length) if self.buffer[i] != self.latched[i]]
+
+        else:
+            changed_pixels = sorted(i for i in self.changed_pixels if self.buffer[i] != self.latched[i])
+
+        return changed_pixels, brightness_changed
+
+
+    def changed_spans(self):
+        """Same as changes() for rle strips, but as (start, length, value)
+        spans of what the pixels are now."""
+        brightness_changed = self._brightness != self.latched_brightness
+
+        if self.latched is None:
+            return list(self.spans), brightness_changed
+
+        return spans.differences(self.latched, self.spans), brightness_changed
+
+
+    def flush(self):
+        self.changed_pixels = set()
+        self.brightness_changed = False
+
+        # Spans are never changed in place so they don't need copying
+        if self.rle:
+            self.latched = self.spans
+            self.latched_brightness = self._brightness
+
+        elif self.packed:
+            self.all_changed = False
+            self.latched = self.buffer[:]
+            self.latched_solid = self.solid
+            self.latched_brightness = self._brightness
+
+
+    def same_kind(self, other):
+        """Same length, backend and brightness."""
+        return self.length == other.length and self.packed == other.packed and self.rle == other.rle and self.brightness == other.brightness
+
+
+    def same_as(self, other):
+        """Same length, backend, brightness and pixels."""
+        if not self.same_kind(other):
+            return False
+
+        if self.rle:
+            return self.spans == other.spans
+
+        if self.packed:
+            return self.buffer == other.buffer
+
+        return all(mine is theirs or mine == theirs for mine, theirs in zip(self._pixels, other._pixels))
+
+
+    def copy_from(self, other):
+        self.brightness = other.brightness
+
+        if self.rle:
+            self.spans = other.spans
+
+        elif self.packed:
+            self.set_values(other.buffer)
+
+        else:
+            for i, pixel in enumerate(other._pixels):
+                self.set_pixel(i, pixel)
+
+
+    def value(self, i):
+        """Packed colour of a pixel, ready to be given to setPixelColor."""
+        if self.rle:
+            return spans.value_at(self.spans, i)
+
+        if self.packed:
+            return self.buffer[i]
+
+        return colortools.pack(self._pixels[i])
+
+
+    def set_value(self, i, value):
+        if self.rle:
+            if i < self.length and spans.value_at(self.spans, i) != value:
+                self.spans = spans.spliced(self.spans, i, [(0, 1, value)])
+
+        elif i < self.length and self.buffer[i] != value:
+            self.buffer[i] = value
+            self.changed_pixels.add(i)
+            self.solid = None
+
+
+    def set_values(self, values, start=0):
+        count = min(self.length - start, len(values))
+
+        if self.rle:
+            self.set_spans(spans.encode(values[:count]), start)
+            return
+
+        previous = self.buffer[start:start + count]
+
+        if previous == values[:count]:
+            return
+
+        self.buffer[start:start + count] = array('I', values[:count])
+        self.changed_pixels.update(start + i for i, (old, new) in enumerate(zip(previous, values)) if old != new)
+        self.solid = None
+
+
+    def set_spans(self, new, start=0):
+        """Sets pixels from *start* on rle strips, *new* starts at 0."""
+        new = spans.sliced(new, 0, self.length - start)
+
+        if start == 0 and spans.total(new) == self.length:
+            self.spans = new
+
+        elif spans.sliced(self.spans, start, start + spans.total(new)) != new:
+            self.spans = spans.spliced(self.spans, start, new)
+
+
+    def rotate(self, n):
+        """Moves every pixel *n* along, the ones that fall off the end come
+        back round to the start."""
+        if self.rle:
+            self.spans = spans.rotated(self.spans, n)
+
+        elif self.packed:
+            n %= self.length
+            self.set_values(self.buffer[-n:] + self.buffer[:-n] if n else self.buffer[:])
+
+        else:
+            pixels = list(self._pixels)
+
+            for i in range(self.length):
+                self.set_pixel(i, pixels[(i - n) % self.length])
+
+
+    def fill(self, color):
+        """Makes the whole strip one colour, much cheaper than setting every
+        pixel on packed strips."""
+        if not self.packed:
+            for i in range(self.length):
+                self.set_pixel(i, color)
+
+            return
+
+        self.fill_value(colortools.pack(color))
+
+
+    def fill_value(self, value):
+        if self.rle:
+            self.spans = spans.fill(self.length, value)
+
+        elif self.solid != value:
+            self.buffer[:] = array('I', [value]) * self.length
+            self.solid = value
+            self.all_changed = True
 
 
     def set_pixel(self, i, pixel_color):
-        if i < self.length:
-            self.pixels[i] = pixel_color
+        if self.packed:
+            self.set_value(i, colortools.pack(pixel_color))
+
+        # Identity check only, comparing colour.Color values converts them
+        # to hex which is slower than just pushing the pixel again
+        elif i < self.length and self._pixels[i] is not pixel_color:
+            self._pixels[i] = pixel_color
+            self.changed_pixels.add(i)
 
 
     def monochrome_pixels(self, color):
-        for i in range(self.length):
-            self.set_pixel(i, color)
+        self.fill(color)
 
 
     def off_pixels(self):
@@ -70,12 +350,18 @@ class Strip:
         yield seconds * 1000
 
 
-    def gradient(self, pixels, speed, brightness=255):
+    def gradient(self, pixels, speed, brightness=255, values=None):
+        """*values* are the already packed pixels, packed strips use them
+        instead of packing every pixel again."""
         self.brightness = brightness
 
-        for i in range(self.length):
-            if i < len(pixels):
-                self.set_pixel(i, pixels[i])
+        if self.packed and values is not None:
+            self.set_values(values)
+
+        else:
+            for i in range(self.length):
+                if i < len(pixels):
+                    self.set_pixel(i, pixels[i])
 
         yield speed
 
@@ -116,20 +402,32 @@ class Strip:
 
 
     def cycle(self, pixels, speed):
-        # In cases where the colors don't divide perfectly into the strip, this
-        # will be larger than the strip length!
-        elements = pixels * ceil(self.length / len(pixels))
+        # Rotating the pattern is the same as moving the offset the strip
+        # starts reading it from. It's repeated so there is always a whole
+        # strip of pixels after any offset and each frame is just a slice.
+        # On rle strips the slice is of the spans, so it costs as much as
+        # there are runs of colour in the window rather than pixels.
+        if self.packed:
+            pattern = array('I', [colortools.pack(color) for color in pixels])
+        else:
+            pattern = list(pixels)
+
+        repeated = pattern * (ceil(self.length / len(pattern)) + 1)
+        offset = 0
+
+        if self.rle:
+            repeated = spans.encode(repeated)
 
         while True:
-            for i, color in enumerate(elements):
-                self.set_pixel(i, color)
-
-            elements.append(elements.pop(0))
-            yield speed
-
-
-
-
+            if self.rle:
+                self.set_spans(spans.sliced(repeated, offset, offset + self.length))
 
+            elif self.packed:
+                self.set_values(repeated[offset:offset + self.length])
 
+            else:
+                for i, color in enumerate(repeated[offset:offset + self.length]):
+                    self.set_pixel(i, color)
 
+            offset = (offset + 1) % len(pattern)
+            yield speed
@@ -1,15 +1,21 @@
-import time
-import random
+import asyncio
+import os
+import signal
 import sys
 
 import rpi_ws281x as leds
 import RPi.GPIO as GPIO
 import dht22
-import colour
 
+# Only the imports above need the Pi, these run and are tested anywhere
 import colortools
 import ledtools
 import animatetools
+import motion
+import render
+import runtime
+import sensors
+import timing
 
 
 
@@ -24,14 +30,17 @@ LED_INVERT          = False   # True to invert the signal (when using NPN transi
 LEDTEMP_CHANNEL     = 0
 LEDHUMIDITY_CHANNEL = 1
 LED_STRIP           = leds.ws.WS2812_STRIP
+LED_GAMMA           = None    # No correction, --gamma uses colortools.gamma_table() (evens out fades but darkens every colour, ORANGE's green 127 -> 55)
 
 
 # Motion Sensor configuration:
 MOTION_SENSOR_PIN = 17
+MOTION_DEBOUNCE_MS = 200
+PREEMPT_ON_MOTION = False  # Start a new animation if there's motion during one
 
 
 # Animation configuration:
-BETWEEN_ITERATIONS = 750
+BETWEEN_ITERATIONS = runtime.BETWEEN_ITERATIONS
 
 temperature_scale = colortools.Scale([
     (animatetools.RED, 5),
@@ -48,133 +57,104 @@ humidity_scale = colortools.Scale([
 ])
 
 
-
-# Convert virtual led representations into physical output
-
-def ms_to_s(ms):
-    return ms/1000
-
-def set_pixel(strip, pixel, color):
-    if color == colour.Color("white"):
-        strip.setPixelColor(pixel, leds.Color(255, 255, 255, 255))
-
-    else:
-        strip.setPixelColor(pixel, leds.Color(int(255 * color.red), int(255 * color.green), int(255 * color.blue), 0))
-
-
-def update(strips):
-    for leds in strips:
-        leds.strip.setBrightness(leds.brightness)
-
-        for idx, color in enumerate(leds.pixels):
-            set_pixel(leds.strip, idx, color)
-
-    for leds in strips:
-        leds.strip.show()
-
-
-def run(strips, animation):
-    for ms in strips.animate(animation):
-        update(list(strips))
-        time.sleep(ms/1000.0)
-
-
-
 # Main loop
 if __name__ == '__main__':
-    debug = sys.argv[1] == '--debug' if len(sys.argv) > 1 else False
+    debug = '--debug' in sys.argv[1:]
+    render.RENDER_AHEAD = '--render-ahead' in sys.argv[1:]
+    rle = '--spans' in sys.argv[1:]
+    gamma = colortools.gamma_table() if '--gamma' in sys.argv[1:] else LED_GAMMA
     print(sys.argv)
 
+    # Timings are dumped to stdout with `kill -USR1 <pid>`, or by typing
+    # 'timings' in debug mode
+    if '--timings' in sys.argv[1:] or os.environ.get('LED_TIMINGS'):
+        timing.timings.enabled = True
+        signal.signal(signal.SIGUSR1, lambda *_: timing.timings.dump())
+
     # HARDWARE SETUP
-    temp_strip = leds.PixelStrip(LED_COUNT, LEDTEMP_PIN, LED_FREQ_HZ, LED_DMA, LED_INVERT, LED_BRIGHTNESS, LEDTEMP_CHANNEL, LED_STRIP)
+    temp_strip = leds.PixelStrip(LED_COUNT, LEDTEMP_PIN, LED_FREQ_HZ, LED_DMA, LED_INVERT, LED_BRIGHTNESS, LEDTEMP_CHANNEL, LED_STRIP, gamma)
     temp_strip.begin()
 
-    humidity_strip = leds.PixelStrip(LED_COUNT, LEDHUMIDITY_PIN, LED_FREQ_HZ, LED_DMA, LED_INVERT, LED_BRIGHTNESS, LEDHUMIDITY_CHANNEL, LED_STRIP)
+    humidity_strip = leds.PixelStrip(LED_COUNT, LEDHUMIDITY_PIN, LED_FREQ_HZ, LED_DMA, LED_INVERT, LED_BRIGHTNESS, LEDHUMIDITY_CHANNEL, LED_STRIP, gamma)
     humidity_strip.begin()
 
     GPIO.setmode(GPIO.BCM)
     GPIO.setup(MOTION_SENSOR_PIN, GPIO.IN)
 
+    # dht22.EDGES capture hasn't been proven on the Pi yet, it falls back to
+    # polling by itself if it keeps failing
     temp_humidity_sensor = dht22.DHT22(pin=26)
+    temp_humidity_sampler = sensors.Sampler(temp_humidity_sensor)
 
     # PROGRAM SETUP
-    temperature_leds = ledtools.Strip(temp_strip, temp_strip.numPixels(), animatetools.BLACK, LED_BRIGHTNESS)
-    humidity_leds = ledtools.Strip(humidity_strip, humidity_strip.numPixels(), animatetools.BLACK, LED_BRIGHTNESS)
+    temperature_leds = ledtools.Strip(temp_strip, temp_strip.numPixels(), animatetools.BLACK, LED_BRIGHTNESS, packed=True, rle=rle)
+    humidity_leds = ledtools.Strip(humidity_strip, humidity_strip.numPixels(), animatetools.BLACK, LED_BRIGHTNESS, packed=True, rle=rle)
     both_led_strips = ledtools.Strips([temperature_leds, humidity_leds])
 
-    last_temperature = 25
-    last_humidity = 70
+    temperature_history = sensors.History()
+    humidity_history = sensors.History()
+    state = {'temperature': 25, 'humidity': 70, 'reading': None, 'buckets': None}
 
+    # Sensor history is dumped to stdout with `kill -USR2 <pid>`
+    signal.signal(signal.SIGUSR2, lambda *_: print(f'Temperature: {temperature_history.readings()}\nHumidity: {humidity_history.readings()}', flush=True))
 
-    # ALL GOOD
-    if debug:
-        print('Starting in debug mode (:')
 
-    else:
-        print('Starting (:')
+    def draw_sensors(redraw):
+        reading = temp_humidity_sampler.latest
 
+        if reading is not None and reading != state['reading']:
+            state['reading'] = reading
+            timestamp, result = reading
+            temperature_history.add(timestamp, result.temperature)
+            humidity_history.add(timestamp, result.humidity)
+            state['humidity'] = humidity_history.ema
+            state['temperature'] = temperature_history.ema
+            print(f'Humidity: {result.humidity} ({state["humidity"]:.1f}) & temperature: {result.temperature} ({state["temperature"]:.1f})')
 
-    if debug:
-        while True:
-            cmd = input("🔧 \033[94m Type 'temp', 'humidity', 'all', or an animation number:\033[0m ")
-
-            if cmd == 'temp':
-                print('Running temperature from 0 to 50')
-
-                for num in range (0, 50):
-                    temperature_leds.monochrome_pixels(temperature_scale.choose(int(num)))
-                    update([temperature_leds])
-                    time.sleep(ms_to_s(500))
-
-            elif cmd == 'humidity':
-                print('Running humidity from 0 to 100')
-
-                for num in range (0, 100):
-                    humidity_leds.monochrome_pixels(humidity_scale.choose(int(num)))
-                    update([humidity_leds])
-                    time.sleep(ms_to_s(500))
-
-            elif cmd == 'all':
-                for num, animation in animatetools.animations.items():
-                    print(f'Running animation {num}')
-                    run(both_led_strips, animation)
-                    time.sleep(ms_to_s(BETWEEN_ITERATIONS))
-
-            else:
-                try:
-                    print(f'Looking for animation {cmd}.')
-                    animation = animatetools.animations[int(cmd)]
-                    print(f'Running animation {cmd}')
-                    run(both_led_strips, animation)
-                    time.sleep(ms_to_s(BETWEEN_ITERATIONS))
-                except:
-                    print('Invalid animation number')
+        # Only redraw when the smoothed value moves into a different colour,
+        # or after an animation has drawn over the strips
+        temperature_bucket = temperature_scale.bucket(state['temperature'])
+        humidity_bucket = humidity_scale.bucket(state['humidity'])
 
-    else:
-        while True:
-            moving = GPIO.input(MOTION_SENSOR_PIN)
+        if redraw or (temperature_bucket, humidity_bucket) != state['buckets']:
+            state['buckets'] = (temperature_bucket, humidity_bucket)
 
-            if moving:
-                print('Motion detected')
+            temperature_leds.fill_value(temperature_scale.lookup(temperature_bucket))
+            render.update([temperature_leds])
 
-                animation = random.choice(list(animatetools.animations.values()))
-                run(both_led_strips, animation)
-                time.sleep(ms_to_s(BETWEEN_ITERATIONS))
-            else:
-                print('No motion')
+            humidity_leds.fill_value(humidity_scale.lookup(humidity_bucket))
+            render.update([humidity_leds])
 
-                result = temp_humidity_sensor.read()
 
-                if result.is_valid():
-                    last_humidity = result.humidity
-                    last_temperature = result.temperature
-                    print(f'Humidity: {last_humidity} & temperature: {last_temperature}')
+    async def sweep(name, leds, scale, end):
+        print(f'Running {name} from 0 to {end}')
 
-                temperature_leds.monochrome_pixels(temperature_scale.choose(int(last_temperature)))
-                update([temperature_leds])
+        for num in range(0, end):
+            leds.fill_value(scale.lookup(num))
+            render.update([leds])
+            await asyncio.sleep(runtime.ms_to_s(500))
 
-                humidity_leds.monochrome_pixels(humidity_scale.choose(int(last_humidity)))
-                update([humidity_leds])
 
-                time.sleep(ms_to_s(BETWEEN_ITERATIONS))
+    app = runtime.Runtime(
+        both_led_strips,
+        idle=draw_sensors,
+        sampler=temp_humidity_sampler,
+        preempt=PREEMPT_ON_MOTION,
+        between_ms=BETWEEN_ITERATIONS,
+        commands={
+            'temp': lambda: sweep('temperature', temperature_leds, temperature_scale, 50),
+            'humidity': lambda: sweep('humidity', humidity_leds, humidity_scale, 100),
+        },
+    )
 
+
+    # ALL GOOD
+    if debug:
+        print('Starting in debug mode (:')
+        asyncio.run(app.console())
+
+    else:
+        print('Starting (:')
+        app.motion_events = motion.MotionEvents(MOTION_DEBOUNCE_MS)
+        app.motion_events.attach(GPIO, MOTION_SENSOR_PIN)
+        asyncio.run(app.run())
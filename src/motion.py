@@ -0,0 +1,54 @@
+import time
+
+
+# Edges closer together than this are one movement
+DEBOUNCE_MS = 200
+
+
+class MotionEvents:
+    """Turns motion sensor interrupts into something the main loop can check.
+
+    attach() registers a GPIO.add_event_detect callback for rising edges.
+    Every debounced edge is remembered until moving() is next called, and
+    functions in *listeners* are called with its timestamp, from the GPIO
+    callback thread (runtime.Runtime uses this to wake up).
+
+    """
+    def __init__(self, debounce_ms=DEBOUNCE_MS, clock=time.monotonic):
+        self.debounce_ms = debounce_ms
+        self.clock = clock
+        self.moved = False
+        self.listeners = []
+        self.last_edge = None
+        self.gpio = None
+        self.pin = None
+
+
+    def attach(self, gpio, pin):
+        self.gpio = gpio
+        self.pin = pin
+        gpio.add_event_detect(pin, gpio.RISING, callback=self.on_edge)
+
+
+    def on_edge(self, channel=None):
+        now = self.clock()
+
+        if self.last_edge is not None and (now - self.last_edge) * 1000 < self.debounce_ms:
+            return
+
+        self.last_edge = now
+        self.moved = True
+
+        for listener in self.listeners:
+            listener(now)
+
+
+    def moving(self):
+        """True if there was motion since the last call, or the sensor is
+        still reporting motion now."""
+        moved, self.moved = self.moved, False
+
+        if self.gpio is not None and self.gpio.input(self.pin):
+            return True
+
+        return moved
@@ -0,0 +1,122 @@
+import shutil
+import sys
+from array import array
+
+import colortools
+
+
+# Draws strips in a terminal. TerminalStrip stands in for rpi_ws281x.PixelStrip
+# so frames go through render.update the same way they do on the Pi, and only
+# the pixels that changed get drawn again.
+
+CELL = '◼︎'
+RESET = '\033[0m'
+CLEAR = '\033[2J'
+HIDE_CURSOR = '\033[?25l'
+SHOW_CURSOR = '\033[?25h'
+
+# Escape sequences remembered, for every colour at every brightness seen
+ESCAPE_CACHE_SIZE = 4096
+
+
+class Terminal:
+    """Strips are laid out one under the other, wrapping every *width*
+    pixels, with a blank row between them. *gamma* should be what the real
+    strips use, 1 (no correction) unless main.py runs with --gamma."""
+    def __init__(self, file=sys.stdout, width=None, gamma=1):
+        self.file = file
+        self.gamma = gamma
+        self.width = width or shutil.get_terminal_size().columns
+        self.strips = []
+        self.escapes = {}
+        self.next_row = 1
+
+
+    def strip(self, length):
+        strip = TerminalStrip(self, length, self.next_row)
+        self.strips.append(strip)
+        self.next_row += -(-length // self.width) + 1
+        return strip
+
+
+    def escape(self, value, brightness):
+        key = brightness << 32 | value
+        escape = self.escapes.get(key)
+
+        if escape is None:
+            if len(self.escapes) >= ESCAPE_CACHE_SIZE:
+                self.escapes.clear()
+
+            value = colortools.dim(value, brightness, self.gamma)
+            escape = self.escapes[key] = f'\033[38;2;{value >> 16 & 255};{value >> 8 & 255};{value & 255}m'
+
+        return escape
+
+
+    def start(self):
+        """Clears the terminal and draws every strip as it is."""
+        self.file.write(HIDE_CURSOR + CLEAR)
+
+        for strip in self.strips:
+            strip.dirty = set(range(strip.length))
+            strip.show()
+
+
+    def end(self):
+        """Puts the cursor back under the strips."""
+        self.file.write(f'{RESET}\033[{self.next_row};1H{SHOW_CURSOR}')
+        self.file.flush()
+
+
+    def draw(self, strip):
+        parts = []
+        last = None
+        last_escape = None
+
+        for i in sorted(strip.dirty):
+            row, column = divmod(i, self.width)
+
+            # Cells straight after the last one drawn don't need the cursor moved
+            if last != i - 1 or column == 0:
+                parts.append(f'\033[{strip.top + row};{column + 1}H')
+
+            escape = self.escape(strip.values[i], strip.brightness)
+
+            if escape is not last_escape:
+                parts.append(escape)
+                last_escape = escape
+
+            parts.append(CELL)
+            last = i
+
+        parts.append(RESET)
+        self.file.write(''.join(parts))
+        self.file.flush()
+
+
+
+class TerminalStrip:
+    def __init__(self, terminal, length, top):
+        self.terminal = terminal
+        self.length = length
+        self.top = top
+        self.values = array('I', [0]) * length
+        self.brightness = 255
+        self.dirty = set()
+
+    def numPixels(self):
+        return self.length
+
+    def setPixelColor(self, n, color):
+        self.values[n] = color
+        self.dirty.add(n)
+
+    def setBrightness(self, brightness):
+        # Every colour on the strip looks different now
+        self.brightness = brightness
+        self.dirty = set(range(self.length))
+
+    def show(self):
+        if self.dirty:
+            self.terminal.draw(self)
+            self.dirty = set()
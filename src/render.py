@@ -0,0 +1,182 @@
+import os
+import queue
+import threading
+
+import animatetools
+import framefile
+import ledtools
+import scheduler
+import timing
+
+
+# Convert virtual led representations into physical output, anything with
+# setPixelColor, setBrightness and show works.
+
+BAKED_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'baked')
+
+# Work frames out on a worker thread while the one before is being shown
+RENDER_AHEAD = False
+
+# How many finished frames the worker can get ahead by
+RENDER_AHEAD_FRAMES = 1
+
+FINISHED = object()
+
+
+def update(strips):
+    """Pushes what changed on each strip and shows it. Strips where nothing
+    changed since they were last shown aren't touched at all."""
+    timings = timing.timings
+    changed_strips = []
+
+    for leds in strips:
+        if leds.rle:
+            changed_pixels, brightness_changed = leds.changed_spans()
+        else:
+            changed_pixels, brightness_changed = leds.changes()
+
+        if not changed_pixels and not brightness_changed:
+            leds.flush()
+            continue
+
+        changed_strips.append(leds)
+
+        if brightness_changed:
+            start = timings.start()
+            leds.strip.setBrightness(leds.brightness)
+            timings.stop('brightness', start)
+
+        start = timings.start()
+
+        # rle strips give spans, one colour for every pixel in each
+        if leds.rle:
+            for first, length, value in changed_pixels:
+                for idx in range(first, first + length):
+                    leds.strip.setPixelColor(idx, value)
+
+        else:
+            for idx in changed_pixels:
+                leds.strip.setPixelColor(idx, leds.value(idx))
+
+        timings.stop('pixels', start)
+
+    for leds in changed_strips:
+        start = timings.start()
+        leds.strip.show()
+        timings.stop('show', start)
+        leds.flush()
+
+
+async def show_frames_async(strips, frames, name=None):
+    """Shows frames on time, other tasks run while each frame is up.
+    Cancel the task to stop the animation part way through."""
+    timings = timing.timings
+    frame_scheduler = scheduler.Scheduler(drop_late=True)
+    frames = iter(frames)
+
+    try:
+        async for ms in frame_scheduler.schedule_async(timings.timed('generate', frames)):
+            start = timings.start()
+            update(list(strips))
+            timings.stop('update', start)
+            timings.frame(name, frame_scheduler.lateness[-1])
+
+    finally:
+        # Let render_ahead's worker and baked files clean up straight away
+        # when cancelled, instead of whenever the generator is collected
+        if hasattr(frames, 'close'):
+            frames.close()
+
+        timings.dropped(name, frame_scheduler.dropped)
+
+        if frame_scheduler.lateness:
+            print(f'Frames were up to {max(frame_scheduler.lateness):.1f}ms late, {frame_scheduler.dropped} dropped')
+
+
+def render_ahead(strips, animation):
+    """Same frames as strips.animate(animation), worked out on a thread.
+
+    The animation runs on copies of the strips and each finished frame is
+    handed over as packed buffers, so the next frame is being worked out
+    while this one is pushed and shown. The strips have to be packed.
+
+    """
+    copies = ledtools.Strips([ledtools.Strip(None, leds.length, animatetools.BLACK, leds.brightness, packed=True) for leds in strips])
+
+    for leds, copy in zip(strips, copies):
+        copy.set_values(leds.values())
+
+    frames = queue.Queue(maxsize=RENDER_AHEAD_FRAMES)
+    stopped = threading.Event()
+
+    def hand_over(item):
+        while not stopped.is_set():
+            try:
+                frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+
+        return False
+
+    def work():
+        try:
+            for ms in copies.animate(animation):
+                if not hand_over((ms, [(copy.brightness, copy.buffer[:]) for copy in copies])):
+                    return
+
+            hand_over(FINISHED)
+
+        except Exception as error:
+            hand_over(error)
+
+    worker = threading.Thread(target=work, daemon=True)
+    worker.start()
+
+    try:
+        while True:
+            frame = frames.get()
+
+            if frame is FINISHED:
+                return
+
+            if isinstance(frame, Exception):
+                raise frame
+
+            ms, states = frame
+
+            for leds, (brightness, buffer) in zip(strips, states):
+                leds.brightness = brightness
+                leds.set_values(buffer)
+
+            yield ms
+
+    finally:
+        stopped.set()
+        worker.join()
+
+
+def frames(strips, animation):
+    if RENDER_AHEAD:
+        return render_ahead(strips, animation)
+
+    return strips.animate(animation)
+
+
+def frames_for_number(strips, num):
+    """Frames of the baked version of an animation if there is one and it
+    was baked from the animations as they are now, for strips this long."""
+    path = framefile.baked_path(BAKED_DIRECTORY, num)
+
+    if os.path.exists(path):
+        if not framefile.is_current(path):
+            print(f'{path} is out of date, bake it again')
+
+        elif not all(framefile.is_current(path, leds.length) for leds in strips):
+            print(f'{path} was baked for a different strip length, bake it again')
+
+        else:
+            return framefile.play(strips, path)
+
+    return frames(strips, animatetools.animations[num])
+
@@ -0,0 +1,209 @@
+import asyncio
+import random
+
+import animatetools
+import render
+import timing
+
+
+# Runs everything main.py does as asyncio tasks on one event loop, instead of
+# a loop that blocks on each animation.
+
+BETWEEN_ITERATIONS = 750
+
+PROMPT = "🔧 \033[94m Type 'temp', 'humidity', 'all', 'timings', or an animation number:\033[0m "
+
+
+def ms_to_s(ms):
+    return ms/1000
+
+
+class Runtime:
+    """The animation player, sensor sampling, motion and the debug console.
+
+    Only one animation plays at a time, play() cancels whatever is playing
+    first. Sensor reads block for a few ms so they go through
+    run_in_executor, and wait until no animation is playing. Motion
+    interrupts come in from the GPIO thread with call_soon_threadsafe.
+
+    *idle* is called with redraw=True/False to draw the strips when nothing
+    is animating, redraw is True after an animation has drawn over them.
+    *commands* maps extra console commands to functions returning a
+    coroutine.
+
+    """
+    def __init__(self, strips, idle=None, sampler=None, motion_events=None, preempt=False,
+                 between_ms=BETWEEN_ITERATIONS, commands=None):
+        self.strips = strips
+        self.idle = idle
+        self.sampler = sampler
+        self.motion_events = motion_events
+        self.preempt = preempt
+        self.between_ms = between_ms
+        self.commands = commands or {}
+        self.animation = None
+        self.moved = None
+
+
+    async def play(self, num):
+        """Starts animation *num*, returns its task."""
+        await self.stop()
+        self.animation = asyncio.create_task(self.show(num))
+        return self.animation
+
+
+    async def show(self, num):
+        print(f'Running animation {num}')
+        await render.show_frames_async(self.strips, render.frames_for_number(self.strips, num), num)
+
+
+    async def stop(self):
+        """Cancels the animation that's playing, if there is one."""
+        animation, self.animation = self.animation, None
+
+        if animation is not None and not animation.done():
+            animation.cancel()
+
+            try:
+                await animation
+            except asyncio.CancelledError:
+                pass
+
+
+    async def sample(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            # The DHT22's pulses are timed by a loop that would be fighting
+            # the frames for the GIL, so only read it between animations
+            if self.animation is not None and not self.animation.done():
+                await asyncio.wait({self.animation})
+                continue
+
+            delay = await loop.run_in_executor(None, self.sampler.sample)
+            await asyncio.sleep(delay)
+
+
+    def listen(self):
+        """Sets self.moved whenever the motion sensor fires."""
+        loop = asyncio.get_running_loop()
+        self.moved = asyncio.Event()
+        self.motion_events.listeners.append(lambda _: loop.call_soon_threadsafe(self.moved.set))
+
+
+    async def wait_for_motion(self, seconds):
+        try:
+            await asyncio.wait_for(self.moved.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+
+    async def watch(self):
+        """Plays a random animation on motion and draws *idle* otherwise.
+
+        With *preempt*, motion during an animation cancels it and starts a
+        new one.
+
+        """
+        redraw = True
+
+        while True:
+            if self.motion_events.moving():
+                print('Motion detected')
+                self.moved.clear()
+                animation = await self.play(random.choice(list(animatetools.animations.keys())))
+
+                if self.preempt:
+                    moved = asyncio.create_task(self.moved.wait())
+                    await asyncio.wait({animation, moved}, return_when=asyncio.FIRST_COMPLETED)
+                    moved.cancel()
+
+                    if not animation.done():
+                        continue
+
+                else:
+                    await asyncio.wait({animation})
+
+                # Fail like anything else would, so the container restarts
+                if not animation.cancelled() and animation.exception() is not None:
+                    raise animation.exception()
+
+                redraw = True
+
+            else:
+                print('No motion')
+                await self.stop()
+                self.idle(redraw)
+                redraw = False
+
+            self.moved.clear()
+            await self.wait_for_motion(ms_to_s(self.between_ms))
+
+
+    async def run(self):
+        """Runs until something fails, the production mode."""
+        self.listen()
+        tasks = [asyncio.create_task(self.watch())]
+
+        if self.sampler is not None:
+            tasks.append(asyncio.create_task(self.sample()))
+
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            await self.stop()
+
+
+    async def play_all(self):
+        for num in animatetools.animations.keys():
+            await self.show(num)
+            await asyncio.sleep(ms_to_s(self.between_ms))
+
+
+    async def command(self, cmd):
+        """Handles one console command. Commands that animate run as the
+        current animation, so typing another one stops it."""
+        if cmd == 'timings':
+            timing.timings.dump()
+
+        elif cmd == 'all':
+            await self.stop()
+            self.animation = asyncio.create_task(self.play_all())
+
+        elif cmd in self.commands:
+            await self.stop()
+            self.animation = asyncio.create_task(self.commands[cmd]())
+
+        else:
+            try:
+                num = int(cmd)
+                animatetools.animations[num]
+            except (ValueError, KeyError):
+                print('Invalid animation number')
+                return
+
+            await self.play(num)
+
+
+    async def console(self, read=input):
+        """The debug mode, reads commands until end of input."""
+        loop = asyncio.get_running_loop()
+
+        try:
+            while True:
+                try:
+                    cmd = await loop.run_in_executor(None, read, PROMPT)
+                except EOFError:
+                    # Let the last command finish when input is piped in
+                    if self.animation is not None:
+                        await asyncio.wait({self.animation})
+
+                    return
+
+                await self.command(cmd.strip())
+
+        finally:
+            await self.stop()
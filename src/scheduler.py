@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+
+NS_PER_MS = 1000000
+
+
+class Scheduler:
+    """Shows frames on absolute deadlines instead of sleeping for each delay.
+
+    Time spent rendering and pushing a frame comes out of that frame's delay
+    so it doesn't add up over an animation. With *drop_late* frames whose
+    whole delay has already gone by are skipped, the next frame shown
+    includes whatever they changed anyway.
+
+    """
+    def __init__(self, drop_late=False, clock=time.monotonic_ns, sleep=time.sleep):
+        self.drop_late = drop_late
+        self.clock = clock
+        self.sleep = sleep
+        self.deadline = None
+        self.lateness = []
+        self.dropped = 0
+
+
+    def start(self):
+        self.deadline = self.clock()
+        self.lateness = []
+        self.dropped = 0
+
+
+    def late_ms(self):
+        return (self.clock() - self.deadline) / NS_PER_MS
+
+
+    def advance(self, ms):
+        """Moves the deadline *ms* on, returns the seconds left until it."""
+        self.deadline += int(ms * NS_PER_MS)
+        return max(self.deadline - self.clock(), 0) / 1000000000
+
+
+    def wait(self, ms):
+        """Waits until *ms* after the last deadline."""
+        remaining = self.advance(ms)
+
+        if remaining > 0:
+            self.sleep(remaining)
+
+
+    def skip(self, ms):
+        """True if the frame should be dropped, its delay has already gone by."""
+        late = self.late_ms()
+
+        if self.drop_late and late >= ms:
+            self.deadline += int(ms * NS_PER_MS)
+            self.dropped += 1
+            return True
+
+        self.lateness.append(late)
+        return False
+
+
+    def schedule(self, frames):
+        """Yields each frame's ms once it's time to show it.
+
+        Render the frame and then ask for the next one, the wait for its
+        delay happens in between.
+
+        """
+        self.start()
+        skipped = False
+
+        for ms in frames:
+            skipped = self.skip(ms)
+
+            if not skipped:
+                yield ms
+                self.wait(ms)
+
+        # Make sure whatever the last frames changed still gets shown
+        if skipped:
+            self.lateness.append(self.late_ms())
+            yield 0
+
+
+    async def schedule_async(self, frames):
+        """Same as schedule() but awaits the deadlines, so other tasks run
+        while a frame is up and cancelling the task stops the animation."""
+        self.start()
+        skipped = False
+
+        for ms in frames:
+            skipped = self.skip(ms)
+
+            if not skipped:
+                yield ms
+                await asyncio.sleep(self.advance(ms))
+
+        if skipped:
+            self.lateness.append(self.late_ms())
+            yield 0
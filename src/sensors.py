@@ -0,0 +1,158 @@
+import time
+from array import array
+from bisect import bisect_left, insort
+
+
+# The DHT22 can't be read more often than every 2 seconds
+SAMPLE_INTERVAL = 2
+MAX_BACKOFF = 30
+
+
+class Sampler:
+    """Reads a sensor and keeps the latest valid result.
+
+    Call sample() from something that sleeps for the delay it returns in
+    between, runtime.Runtime does this on asyncio's executor.
+
+    *sensor* is anything with a read() that returns a result with is_valid(),
+    like dht22.DHT22. Invalid results are retried, waiting twice as long
+    after each failure in a row up to *max_backoff* seconds.
+
+    latest is (timestamp, result) or None until the first valid read. It is
+    only ever replaced as a whole, so reading it from another thread is safe
+    without a lock.
+
+    """
+    def __init__(self, sensor, interval=SAMPLE_INTERVAL, max_backoff=MAX_BACKOFF, clock=time.monotonic):
+        self.sensor = sensor
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.latest = None
+        self.failures = 0
+
+
+    def sample(self):
+        """Reads the sensor once, returns how long to wait before the next read."""
+        try:
+            result = self.sensor.read()
+        except Exception as error:
+            print(f'Error reading sensor: {error}')
+            result = None
+
+        if result is not None and result.is_valid():
+            self.latest = (self.clock(), result)
+            self.failures = 0
+            return self.interval
+
+        self.failures += 1
+        return min(self.interval * 2 ** (self.failures - 1), self.max_backoff)
+
+
+
+# Readings kept for smoothing
+HISTORY_SIZE = 16
+EMA_WEIGHT = 0.3
+
+# Readings further than this from the median are ignored, unless there are
+# more than MAX_REJECTED of them in a row that agree with each other (then
+# it's probably real, like the humidity when someone has a shower) and the
+# history starts again from them
+MAX_JUMP = 5
+MAX_REJECTED = 3
+
+
+class History:
+    """Fixed size ring buffer of timestamped readings.
+
+    The mean, exponential moving average and a sorted copy of the values
+    for the median are kept up to date as readings are added.
+
+    """
+    def __init__(self, size=HISTORY_SIZE, max_jump=MAX_JUMP, ema_weight=EMA_WEIGHT, max_rejected=MAX_REJECTED):
+        self.size = size
+        self.max_jump = max_jump
+        self.ema_weight = ema_weight
+        self.max_rejected = max_rejected
+        self.reset()
+
+
+    def reset(self):
+        self.timestamps = array('d', [0]) * self.size
+        self.values = array('d', [0]) * self.size
+        self.ordered = []
+        self.next = 0
+        self.count = 0
+        self.total = 0
+        self.ema = None
+        self.rejected = []
+
+
+    def __len__(self):
+        return self.count
+
+
+    def add(self, timestamp, value):
+        """Adds a reading, returns False if it was rejected as an outlier."""
+        if self.count >= 3 and abs(value - self.median()) > self.max_jump:
+            run = self.rejected + [(timestamp, value)]
+
+            if len(run) <= self.max_rejected or not self.agree(run):
+                self.rejected = run[-self.max_rejected:]
+                return False
+
+            self.reset()
+
+            for reading in run:
+                self.append(*reading)
+
+            return True
+
+        self.rejected = []
+        self.append(timestamp, value)
+        return True
+
+
+    def agree(self, readings):
+        values = [value for _, value in readings]
+        return max(values) - min(values) <= self.max_jump
+
+
+    def append(self, timestamp, value):
+        if self.count == self.size:
+            old = self.values[self.next]
+            self.total -= old
+            del self.ordered[bisect_left(self.ordered, old)]
+        else:
+            self.count += 1
+
+        self.timestamps[self.next] = timestamp
+        self.values[self.next] = value
+        self.total += value
+        insort(self.ordered, value)
+        self.next = (self.next + 1) % self.size
+        self.ema = value if self.ema is None else self.ema + self.ema_weight * (value - self.ema)
+
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+
+    def median(self):
+        if not self.count:
+            return None
+
+        ordered = self.ordered
+        middle = self.count // 2
+
+        if self.count % 2:
+            return ordered[middle]
+
+        return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+    def readings(self):
+        """(timestamp, value) from oldest to newest."""
+        start = self.next if self.count == self.size else 0
+        order = [(start + i) % self.size for i in range(self.count)]
+        return [(self.timestamps[i], self.values[i]) for i in order]
@@ -0,0 +1,140 @@
+from array import array
+from bisect import bisect_right
+from itertools import groupby
+
+
+# Run length encoded pixels. A strip is a list of (start, length, value)
+# spans covering every pixel in order, value is a packed colour like
+# colortools.pack gives. Neighbouring spans are never the same colour, so two
+# lists of spans are equal exactly when the pixels are.
+#
+# Spans are tuples and nothing here changes a list it's given, lists can be
+# shared between strips and frames.
+
+END = float('inf')
+
+
+def encode(values):
+    spans = []
+    start = 0
+
+    for value, group in groupby(values):
+        length = sum(1 for _ in group)
+        spans.append((start, length, value))
+        start += length
+
+    return spans
+
+
+def decode(spans):
+    values = array('I')
+
+    for _, length, value in spans:
+        values += array('I', [value]) * length
+
+    return values
+
+
+def fill(length, value):
+    return [(0, length, value)] if length else []
+
+
+def total(spans):
+    if not spans:
+        return 0
+
+    start, length, _ = spans[-1]
+    return start + length
+
+
+def find(spans, i):
+    """Index of the span pixel *i* is in."""
+    return bisect_right(spans, (i, END)) - 1
+
+
+def value_at(spans, i):
+    return spans[find(spans, i)][2]
+
+
+def joined(parts):
+    """Puts lists of spans that each start at 0 end to end."""
+    result = []
+    position = 0
+
+    for part in parts:
+        for _, length, value in part:
+            if result and result[-1][2] == value:
+                start, previous, _ = result[-1]
+                result[-1] = (start, previous + length, value)
+            else:
+                result.append((position, length, value))
+
+            position += length
+
+    return result
+
+
+def sliced(spans, start, stop):
+    """Spans for pixels start to stop, moved along to start at 0."""
+    result = []
+
+    for k in range(max(find(spans, start), 0), len(spans)):
+        span_start, length, value = spans[k]
+
+        if span_start >= stop:
+            break
+
+        begin = max(span_start, start)
+        end = min(span_start + length, stop)
+
+        if end > begin:
+            result.append((begin - start, end - begin, value))
+
+    return result
+
+
+def spliced(spans, start, new):
+    """Spans with pixels from *start* replaced by *new* (which starts at 0)."""
+    end = start + total(new)
+    return joined([sliced(spans, 0, start), new, sliced(spans, end, total(spans))])
+
+
+def rotated(spans, n):
+    """Moves every pixel *n* along, the ones that fall off the end come back
+    round to the start."""
+    length = total(spans)
+
+    if not length:
+        return spans
+
+    n %= length
+    return joined([sliced(spans, length - n, length), sliced(spans, 0, length - n)])
+
+
+def differences(old, new):
+    """(start, length, value) of *new* wherever it's different from *old*,
+    both covering the same pixels."""
+    changed = []
+    position = 0
+    i = j = 0
+
+    while i < len(old) and j < len(new):
+        old_start, old_length, old_value = old[i]
+        new_start, new_length, new_value = new[j]
+        end = min(old_start + old_length, new_start + new_length)
+
+        if old_value != new_value:
+            if changed and changed[-1][2] == new_value and sum(changed[-1][:2]) == position:
+                changed[-1] = (changed[-1][0], changed[-1][1] + end - position, new_value)
+            else:
+                changed.append((position, end - position, new_value))
+
+        position = end
+
+        if old_start + old_length == end:
+            i += 1
+
+        if new_start + new_length == end:
+            j += 1
+
+    return changed
@@ -20,6 +20,16 @@ class TestAnimations(unittest.TestCase):
             except:
                 self.fail(f'Error running animation {num}')
 
+    def test_all_animations_packed(self):
+        leds = ledtools.Strip(None, 6, colour.Color("blue"), 255, packed=True)
+
+        for num, animation in animatetools.animations.items():
+            try:
+                for _ in animation(leds):
+                    continue
+            except:
+                self.fail(f'Error running animation {num}')
+
     def test_specific(self):
         leds = ledtools.Strip(None, 6, colour.Color("blue"), 255)
         animation = animatetools.animations[142]
@@ -30,6 +40,77 @@ class TestAnimations(unittest.TestCase):
 
 
 
+class TestGradientExpand(unittest.TestCase):
+    def setUp(self):
+        animatetools.gradient_expand_frames.cache_clear()
+
+    def test_frames_are_shared(self):
+        animation = animatetools.gradient_expand(animatetools.RED, animatetools.YELLOW)
+        led1 = ledtools.Strip(None, 6, colour.Color("blue"), 255, packed=True)
+        led2 = ledtools.Strip(None, 6, colour.Color("blue"), 255, packed=True)
+        frames = animatetools.gradient_expand_frames(6, animatetools.RED.hsl, animatetools.YELLOW.hsl, 1, None)
+
+        next(animation(led1))
+        first = frames.frames[0]
+        next(animation(led2))
+
+        self.assertIs(frames.frames[0], first)
+        self.assertEqual(len(frames.frames), 1)
+
+    def test_frames_are_worked_out_as_they_are_needed(self):
+        animation = animatetools.gradient_expand(animatetools.PINK, animatetools.AQUA)
+        leds = ledtools.Strip(None, 40, colour.Color("blue"), 255, packed=True)
+        frames = animatetools.gradient_expand_frames(40, animatetools.PINK.hsl, animatetools.AQUA.hsl, 1, None)
+        generator = animation(leds)
+
+        next(generator)
+        next(generator)
+        self.assertEqual(len(frames.frames), 2)
+
+    def test_packed_matches_pixels(self):
+        animation = animatetools.gradient_expand(animatetools.BLUE, animatetools.LIME)
+        leds = ledtools.Strip(None, 6, colour.Color("blue"), 255)
+        packed_leds = ledtools.Strip(None, 6, colour.Color("blue"), 255, packed=True)
+
+        for _ in zip(animation(leds), animation(packed_leds)):
+            self.assertEqual(list(packed_leds.buffer), [colortools.pack_uncached(pixel) for pixel in leds.pixels])
+
+    def test_packed_chunked_matches_pixels(self):
+        for chunk, count in [(3, None), (1, 2)]:
+            animation = animatetools.gradient_expand(animatetools.RED, animatetools.PURPLE, chunk, count)
+            leds = ledtools.Strip(None, 7, colour.Color("blue"), 255)
+            packed_leds = ledtools.Strip(None, 7, colour.Color("blue"), 255, packed=True)
+
+            for _ in zip(animation(leds), animation(packed_leds)):
+                self.assertEqual(list(packed_leds.buffer), [colortools.pack_uncached(pixel) for pixel in leds.pixels])
+
+    def test_chunked(self):
+        animation = animatetools.gradient_expand(animatetools.BLUE, animatetools.LIME, chunk=3)
+        leds = ledtools.Strip(None, 6, colour.Color("blue"), 255)
+
+        for _ in animation(leds):
+            self.assertEqual(leds.pixels[0], leds.pixels[2])
+            self.assertEqual(leds.pixels[3], leds.pixels[5])
+
+
+
+class TestPosterizedCycle(unittest.TestCase):
+    def test_fewer_changes(self):
+        def changed_pixels(animation):
+            leds = ledtools.Strip(None, 60, colour.Color("black"), 255, packed=True)
+            changed = 0
+
+            for _ in animation(leds):
+                changed += len(leds.changes()[0])
+                leds.flush()
+
+            return changed
+
+        pixels = lambda n: colortools.gradient(n, animatetools.RED, animatetools.BLACK)
+        self.assertLess(changed_pixels(animatetools.strip_length_cycle(pixels, chunk=6)), changed_pixels(animatetools.strip_length_cycle(pixels)) / 3)
+
+
+
 if __name__ == '__main__':
     unittest.main()
 
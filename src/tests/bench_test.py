@@ -0,0 +1,47 @@
+import bench
+import animatetools
+
+import unittest
+from tests.helpers import red_then_blue_wipe
+
+
+
+class TestFakePixelStrip(unittest.TestCase):
+    def test_counts(self):
+        strip = bench.FakePixelStrip(3)
+        strip.setPixelColor(1, 0xff0000)
+        strip.show()
+
+        self.assertEqual(strip.numPixels(), 3)
+        self.assertEqual(list(strip.pixels), [0, 0xff0000, 0])
+        self.assertEqual(strip.set_pixel_calls, 1)
+        self.assertEqual(strip.wire_us, 3 * bench.PIXEL_US + bench.LATCH_US)
+
+
+
+class TestBench(unittest.TestCase):
+    def test_bench(self):
+        strips = bench.make_strips(length=3, strip_count=2)
+        result = bench.bench('test', red_then_blue_wipe, strips)
+
+        self.assertEqual(result.frames, 4)
+        self.assertEqual(result.nominal_ms, 1075)
+        self.assertGreaterEqual(result.effective_ms, result.nominal_ms)
+        # Every pixel for the first frame, then one pixel per wipe frame
+        self.assertEqual(result.set_pixel_calls, 2 * (3 + 3))
+        self.assertEqual(result.show_calls, 2 * 4)
+
+    def test_allocations(self):
+        strips = bench.make_strips(length=3, strip_count=1)
+        result = bench.bench('test', red_then_blue_wipe, strips, allocations=True)
+        self.assertGreater(result.allocated_per_frame(), 0)
+
+    def test_pixels_reach_the_strip(self):
+        strips = bench.make_strips(length=3, strip_count=1)
+        bench.bench('test', red_then_blue_wipe, strips)
+        self.assertEqual(list(strips.led_strips[0].strip.pixels), [0x0000ff] * 3)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
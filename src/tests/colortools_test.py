@@ -1,8 +1,92 @@
 import colortools
+import animatetools
 
 import unittest
 import colour
 
+import numpy
+
+
+def hexes(rgb):
+    return ['#%02x%02x%02x' % tuple(row) for row in rgb]
+
+
+def packed(colors):
+    return [colortools.pack_uncached(color) for color in colors]
+
+
+class TestPack(unittest.TestCase):
+    def test_pack(self):
+        self.assertEqual(colortools.pack(colour.Color("red")), 0xff0000)
+
+    def test_pack_black(self):
+        self.assertEqual(colortools.pack(colour.Color("black")), 0)
+
+    def test_pack_white_uses_white_channel(self):
+        self.assertEqual(colortools.pack(colour.Color(rgb=(1, 1, 1))), 0xffffffff)
+
+    def test_unpack(self):
+        self.assertEqual(colortools.unpack(0x00ff00), colour.Color("lime"))
+
+    def test_unpack_white(self):
+        self.assertEqual(colortools.unpack(0xffffffff), colour.Color("white"))
+
+
+
+class TestBrightness(unittest.TestCase):
+    def test_gamma_table_ends(self):
+        table = colortools.gamma_table()
+
+        self.assertEqual((len(table), table[0], table[255]), (256, 0, 255))
+        self.assertLess(table[128], 128)
+
+    def test_full_brightness_keeps_full_channels(self):
+        self.assertEqual(colortools.dim(0xff00ff, 255), 0xff00ff)
+
+    def test_off(self):
+        self.assertEqual(colortools.dim(0xffffffff, 0), 0)
+
+    def test_matches_rpi_ws281x(self):
+        gamma = colortools.gamma_table()
+        self.assertEqual(colortools.dim(0x804020, 100), (gamma[0x80 * 101 >> 8] << 16) | (gamma[0x40 * 101 >> 8] << 8) | gamma[0x20 * 101 >> 8])
+
+    def test_white_channel(self):
+        self.assertEqual(colortools.dim(0xffffffff, 255), 0xffffffff)
+
+
+
+
+class TestPalette(unittest.TestCase):
+    def test_fixed_colors(self):
+        palette = colortools.Palette([colour.Color("red")], size=1)
+        palette.pack(colour.Color("blue"))
+        palette.pack(colour.Color("lime"))
+
+        self.assertEqual(palette.pack(colour.Color("red")), 0xff0000)
+        self.assertEqual(len(palette.fixed), 1)
+
+    def test_recent_colors_are_bounded(self):
+        palette = colortools.Palette(size=2)
+
+        for color in ["red", "blue", "lime"]:
+            palette.pack(colour.Color(color))
+
+        self.assertEqual(list(palette.recent.values()), [0x0000ff, 0x00ff00])
+
+    def test_least_recently_used_is_dropped(self):
+        palette = colortools.Palette(size=2)
+        palette.pack(colour.Color("red"))
+        palette.pack(colour.Color("blue"))
+        palette.pack(colour.Color("red"))
+        palette.pack(colour.Color("lime"))
+
+        self.assertEqual(list(palette.recent.values()), [0xff0000, 0x00ff00])
+
+    def test_white(self):
+        palette = colortools.Palette([colour.Color("white")])
+        self.assertEqual(palette.pack(colour.Color(rgb=(1, 1, 1))), 0xffffffff)
+
+
 
 class TestRainbow(unittest.TestCase):
     def test_rainbow(self):
@@ -20,6 +104,49 @@ class TestGradient(unittest.TestCase):
         gradient = colortools.gradient(4, colour.Color("purple"), colour.Color("black"))
         self.assertEqual(gradient, [colour.Color("purple"), colour.Color("#505"), colour.Color("#2b002b"), colour.Color("black")])
 
+    def test_chunked_gradient(self):
+        gradient = colortools.gradient(4, colour.Color("purple"), colour.Color("black"), chunk=2)
+        self.assertEqual(gradient, [colour.Color("purple"), colour.Color("purple"), colour.Color("#2b002b"), colour.Color("#2b002b")])
+
+
+
+class TestPosterize(unittest.TestCase):
+    def setUp(self):
+        self.gradient = colortools.gradient(10, colour.Color("red"), colour.Color("blue"))
+
+    def test_chunked(self):
+        self.assertEqual(colortools.chunked([1, 2, 3, 4, 5], 2), [1, 1, 3, 3, 5])
+
+    def test_chunk_of_one(self):
+        self.assertEqual(colortools.chunked([1, 2, 3], 1), [1, 2, 3])
+
+    def test_chunk_of_zero(self):
+        self.assertEqual(colortools.chunked([1, 2, 3], 0), [1, 2, 3])
+        self.assertEqual(colortools.gradient(4, colour.Color("purple"), colour.Color("black"), chunk=0),
+                         colortools.gradient(4, colour.Color("purple"), colour.Color("black")))
+
+    def test_chunked_matches_between(self):
+        self.assertEqual(colortools.chunked(self.gradient, 3), colortools.gradient(10, colour.Color("red"), colour.Color("blue"), chunk=3))
+
+    def test_limited(self):
+        limited = colortools.limited(self.gradient, 3)
+
+        self.assertEqual(len({color.hsl for color in limited}), 3)
+        self.assertEqual(limited[0], colour.Color("red"))
+        self.assertEqual(limited[-1], colour.Color("blue"))
+
+    def test_limited_picks_the_closest(self):
+        colors = [colour.Color("red"), colour.Color("#e00"), colour.Color("#00e"), colour.Color("blue")]
+        self.assertEqual(colortools.limited(colors, 2), [colour.Color("red"), colour.Color("red"), colour.Color("blue"), colour.Color("blue")])
+
+    def test_limited_with_few_colors(self):
+        self.assertEqual(colortools.limited(self.gradient[:2], 3), self.gradient[:2])
+
+    def test_posterize(self):
+        posterized = colortools.posterize(self.gradient, chunk=5, count=2)
+
+        self.assertEqual(posterized, [colour.Color("red")] * 5 + [colour.Color("blue")] * 5)
+
 
 
 class TestSimpleColorScale(unittest.TestCase):
@@ -127,12 +254,90 @@ class TestTempScale(unittest.TestCase):
     def test_on_upper_bound(self):
         self.assertEqual(self.scale.choose(22), colour.Color("green"))
 
+    def test_lookup_matches_choose(self):
+        for num in range(0, 30):
+            self.assertEqual(self.scale.lookup(num), colortools.pack_uncached(self.scale.choose(self.scale.bucket(num))))
+
+    def test_lookup_clamps(self):
+        self.assertEqual(self.scale.lookup(-100), 0xff0000)
+        self.assertEqual(self.scale.lookup(100), colortools.pack_uncached(colour.Color("green")))
+
+    def test_lookup_table_is_lazy(self):
+        scale = colortools.Scale([ ( colour.Color("red"), 0 ), ( colour.Color("blue"), 4 ) ])
+        self.assertIsNone(scale.lut)
+        scale.lookup(2)
+        self.assertEqual(len(scale.lut), 5)
+
+    def test_lookup_table_is_rebuilt_with_new_stops(self):
+        scale = colortools.Scale([ ( colour.Color("red"), 0 ), ( colour.Color("blue"), 4 ) ])
+        scale.lookup(2)
+        scale.stops = [ ( colour.Color("lime"), 0 ), ( colour.Color("lime"), 4 ) ]
+        self.assertEqual(scale.lookup(2), 0x00ff00)
+
+    def test_stops_cant_change_in_place(self):
+        scale = colortools.Scale([ ( colour.Color("red"), 0 ), ( colour.Color("blue"), 4 ) ])
+        scale.lookup(2)
+
+        with self.assertRaises(TypeError):
+            scale.stops[0] = ( colour.Color("lime"), 0 )
+
+        with self.assertRaises(AttributeError):
+            scale.stops.append(( colour.Color("lime"), 6 ))
+
+    def test_buckets(self):
+        self.assertEqual([self.scale.bucket(num) for num in [-3, 5, 12.2, 12.9, 30]], [5, 5, 12, 12, 22])
+
     # def test_full_scale(self):
     #     hexes = list(map(lambda col: col.hex, self.scale.between(5, 22)))
     #     print(hexes)
     #     self.assertEqual(hexes, [])
 
 
+class TestArrays(unittest.TestCase):
+    scale = colortools.Scale([ ( colour.Color("red"), 5 ), ( colour.Color("orange"), 11 ), ( colour.Color("yellow"), 16 ), ( colour.Color("green"), 22 ) ])
+
+    def test_between_array_matches_between(self):
+        self.assertEqual(list(colortools.pack_array(self.scale.between_array(0, 30))), packed(self.scale.between(0, 30)))
+
+    def test_choose_array_positions(self):
+        rgb = self.scale.choose_array([-10, 5, 8, 22, 100])
+        self.assertEqual(list(colortools.pack_array(rgb)), packed([self.scale.choose(num) for num in [-10, 5, 8, 22, 100]]))
+
+    def test_repeated_stops(self):
+        scale = colortools.Scale([ ( colour.Color("red"), 0 ), ( colour.Color("blue"), 2 ), ( colour.Color("blue"), 4 ), ( colour.Color("red"), 6 ) ])
+        self.assertEqual(list(colortools.pack_array(scale.between_array(0, 6))), packed(scale.between(0, 6)))
+
+    def test_main_scales_match_between(self):
+        for scale in [
+            colortools.Scale([(animatetools.RED, 5), (animatetools.ORANGE, 11), (animatetools.YELLOW, 16), (animatetools.LIME, 22)]),
+            colortools.Scale([(animatetools.RED, 50), (animatetools.ORANGE, 56), (animatetools.YELLOW, 61), (animatetools.LIME, 73)]),
+            colortools.Scale([(animatetools.PINK, 0), (animatetools.BLUE, 10), (animatetools.PINK, 20)]),
+        ]:
+            self.assertEqual(list(colortools.pack_array(scale.between_array(0, 100))), packed(scale.between(0, 100)))
+
+    def test_gradients_match(self):
+        for color in [animatetools.LIME, animatetools.GOLD, animatetools.TURQUOISE, animatetools.WHITE]:
+            gradient = colortools.gradient_array(290, color, animatetools.BLACK)
+            self.assertEqual(list(colortools.pack_array(gradient)), packed(colortools.gradient(290, color, animatetools.BLACK)))
+
+    def test_gradient_array(self):
+        gradient = colortools.gradient_array(4, colour.Color("purple"), colour.Color("black"))
+        # What pack gives for colortools.gradient, channels are truncated
+        self.assertEqual(hexes(gradient), ['#80007f', '#550055', '#2a002a', '#000000'])
+
+    def test_to_array_truncates_like_pack(self):
+        self.assertEqual(list(colortools.pack_array(colortools.to_array([animatetools.YELLOW, animatetools.PURPLE]))), packed([animatetools.YELLOW, animatetools.PURPLE]))
+
+    def test_rainbow_array(self):
+        rainbow = colortools.rainbow_array(4, [colour.Color("red"), colour.Color("blue"), colour.Color("lime")])
+        self.assertEqual(hexes(rainbow), ['#ff0000', '#ff0000', '#0000ff', '#0000ff', '#00ff00', '#00ff00'])
+
+    def test_pack_array(self):
+        rgb = numpy.array([[255, 0, 0], [0, 0, 255], [255, 255, 255]], dtype=numpy.uint8)
+        self.assertEqual(list(colortools.pack_array(rgb)), [0xff0000, 0x0000ff, 0xffffffff])
+
+
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,113 @@
+import dht22decode
+
+import unittest
+
+
+
+def capture(the_bytes, short=3, long=8):
+    """What DHT22.read() would collect for these bytes."""
+    samples = [1] * 4 + [0] * 10 + [1] * 10 + [0] * 8
+
+    for byte in the_bytes:
+        for bit in range(7, -1, -1):
+            samples += [1] * (long if byte >> bit & 1 else short)
+            samples += [0] * 6
+
+    return bytearray(samples + [1] * 101)
+
+
+def edges(the_bytes, start=0):
+    """Edges an interrupt capture would see, in (ns, level)."""
+    now = start
+    found = [(now, 0)]
+    now += 80000
+    found.append((now, 1))
+    now += 80000
+
+    for byte in the_bytes:
+        for bit in range(7, -1, -1):
+            found.append((now, 0))
+            now += 50000
+            found.append((now, 1))
+            now += 70000 if byte >> bit & 1 else 27000
+
+    found.append((now, 0))
+    now += 50000
+    found.append((now, 1))
+    return found
+
+
+# 65.2% humidity, 35.1 degrees
+READING = [0x02, 0x8c, 0x01, 0x5f]
+CHECKSUM = sum(READING) & 255
+
+
+
+class TestDecode(unittest.TestCase):
+    def test_runs(self):
+        levels, lengths = dht22decode.runs(bytearray([1, 1, 0, 0, 0, 1]))
+        self.assertEqual(levels.tolist(), [1, 0, 1])
+        self.assertEqual(lengths.tolist(), [2, 3, 1])
+
+    def test_pull_up_lengths(self):
+        lengths = dht22decode.pull_up_lengths(capture(READING + [CHECKSUM]))
+        self.assertEqual(len(lengths), 40)
+        self.assertEqual(lengths[:8].tolist(), [3, 3, 3, 3, 3, 3, 8, 3])
+
+    def test_decode(self):
+        result = dht22decode.decode(capture(READING + [CHECKSUM]))
+
+        self.assertTrue(result.is_valid())
+        self.assertEqual(result.humidity, 65.2)
+        self.assertEqual(result.temperature, 35.1)
+
+    def test_missing_data(self):
+        result = dht22decode.decode(capture(READING))
+        self.assertEqual(result.error_code, dht22decode.DHT22Result.ERR_MISSING_DATA)
+
+    def test_empty(self):
+        result = dht22decode.decode(bytearray())
+        self.assertEqual(result.error_code, dht22decode.DHT22Result.ERR_MISSING_DATA)
+
+    def test_crc(self):
+        result = dht22decode.decode(capture(READING + [CHECKSUM + 1]))
+        self.assertEqual(result.error_code, dht22decode.DHT22Result.ERR_CRC)
+
+    def test_last_pull_up_needs_a_pull_down(self):
+        samples = capture(READING + [CHECKSUM])[:-101] + bytearray([1] * 5)
+        self.assertEqual(len(dht22decode.pull_up_lengths(samples)), 40)
+
+
+
+class TestDecodeEdges(unittest.TestCase):
+    def test_decode(self):
+        result = dht22decode.decode_edges(edges(READING + [CHECKSUM]))
+
+        self.assertTrue(result.is_valid())
+        self.assertEqual(result.humidity, 65.2)
+        self.assertEqual(result.temperature, 35.1)
+
+    def test_pull_up_lengths(self):
+        lengths = dht22decode.edge_pull_up_lengths(edges(READING + [CHECKSUM]))
+        self.assertEqual(lengths[:8].tolist(), [27, 27, 27, 27, 27, 27, 70, 27])
+
+    def test_missed_start(self):
+        result = dht22decode.decode_edges(edges(READING + [CHECKSUM])[3:])
+        self.assertTrue(result.is_valid())
+
+    def test_missing_data(self):
+        result = dht22decode.decode_edges(edges(READING)[:20])
+        self.assertEqual(result.error_code, dht22decode.DHT22Result.ERR_MISSING_DATA)
+
+    def test_no_edges(self):
+        result = dht22decode.decode_edges([])
+        self.assertEqual(result.error_code, dht22decode.DHT22Result.ERR_MISSING_DATA)
+
+    def test_crc(self):
+        result = dht22decode.decode_edges(edges(READING + [CHECKSUM ^ 1]))
+        self.assertEqual(result.error_code, dht22decode.DHT22Result.ERR_CRC)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
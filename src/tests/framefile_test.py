@@ -0,0 +1,175 @@
+import framefile
+import ledtools
+import animatetools
+
+import unittest
+import colour
+import io
+import os
+import tempfile
+from tests.helpers import red_then_blue_wipe
+
+
+
+class TestBake(unittest.TestCase):
+    def bake(self, animation, length):
+        file = io.BytesIO()
+        framefile.bake(animation, length, file)
+        return file.getvalue()
+
+    def test_header(self):
+        self.assertEqual(framefile.read_header(self.bake(red_then_blue_wipe, 3)), 3)
+
+    def test_not_a_baked_file(self):
+        self.assertRaises(ValueError, framefile.read_header, b'nope' + bytes(16))
+
+    def records(self, animation, length):
+        return [(ms, brightness, [(start, list(pixels)) for start, pixels in runs]) for ms, brightness, runs in framefile.read_records(self.bake(animation, length))]
+
+    def test_deltas(self):
+        self.assertEqual(self.records(red_then_blue_wipe, 3), [
+            (1000, 100, [(0, [0xff0000, 0xff0000, 0xff0000])]),
+            (25, 100, [(0, [0x0000ff])]),
+            (25, 100, [(1, [0x0000ff])]),
+            (25, 100, [(2, [0x0000ff])]),
+        ])
+
+    def test_brightness_only(self):
+        def animation(strip):
+            for x in strip.on(colour.Color("red"), 1, 100):
+                yield x
+
+            strip.brightness = 200
+            yield 50
+
+        self.assertEqual(self.records(animation, 2), [
+            (1000, 100, [(0, [0xff0000, 0xff0000])]),
+            (50, 200, []),
+        ])
+
+    def test_repeated_frames_are_merged(self):
+        def animation(strip):
+            for x in strip.on(colour.Color("red"), 1):
+                yield x
+
+            for x in strip.on(colour.Color("red"), 2):
+                yield x
+
+        self.assertEqual(self.records(animation, 2), [
+            (3000, 255, [(0, [0xff0000, 0xff0000])]),
+        ])
+
+    def test_keyframe_when_everything_changes(self):
+        def animation(strip):
+            for x in strip.on(colour.Color("red"), 1):
+                yield x
+
+            for x in strip.on(colour.Color("blue"), 1):
+                yield x
+
+        kinds = []
+        data = self.bake(animation, 2)
+        offset = framefile.HEADER.size
+
+        while offset < len(data):
+            kind, _, run_count, _ = framefile.RECORD.unpack_from(data, offset)
+            kinds.append(kind)
+            offset += framefile.RECORD.size + run_count * framefile.RUN.size + 2 * 4
+
+        self.assertEqual(kinds, [framefile.KEYFRAME, framefile.KEYFRAME])
+
+    def test_runs(self):
+        self.assertEqual(framefile.to_runs([0, 1, 2, 5, 7, 8]), [(0, 3), (5, 4)])
+
+    def test_all_animations(self):
+        for num, animation in animatetools.animations.items():
+            try:
+                for _ in framefile.read_records(self.bake(animation, 6)):
+                    continue
+            except:
+                self.fail(f'Error baking animation {num}')
+
+
+
+class TestPlay(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = framefile.baked_path(directory.name, 1)
+        framefile.bake_to_path(red_then_blue_wipe, 3, self.path)
+
+    def test_play_matches_animate(self):
+        baked = ledtools.Strip(None, 3, animatetools.BLACK, 255, packed=True)
+        live = ledtools.Strip(None, 3, animatetools.BLACK, 255, packed=True)
+
+        for baked_ms, live_ms in zip(framefile.play([baked], self.path), ledtools.Strips([live]).animate(red_then_blue_wipe)):
+            self.assertEqual(baked_ms, live_ms)
+            self.assertEqual(baked.brightness, live.brightness)
+            self.assertEqual(baked.buffer, live.buffer)
+
+    def test_play_all_animations(self):
+        for num, animation in animatetools.animations.items():
+            framefile.bake_to_path(animation, 6, self.path)
+            baked = ledtools.Strip(None, 6, animatetools.BLACK, 255, packed=True)
+            live = ledtools.Strip(None, 6, animatetools.BLACK, 255, packed=True)
+            baked_frames = []
+            live_frames = []
+
+            for ms in framefile.play([baked], self.path):
+                baked_frames.append([ms, baked.brightness, baked.buffer[:]])
+
+            # Repeated frames are merged when baking
+            for ms in ledtools.Strips([live]).animate(animation):
+                if live_frames and live_frames[-1][1:] == [live.brightness, live.buffer]:
+                    live_frames[-1][0] += ms
+                else:
+                    live_frames.append([ms, live.brightness, live.buffer[:]])
+
+            self.assertEqual(baked_frames, live_frames, f'Animation {num}')
+
+    def test_play_only_changes_pixels_that_changed(self):
+        leds = ledtools.Strip(None, 3, animatetools.BLACK, 255, packed=True)
+        play = framefile.play([leds], self.path)
+
+        next(play)
+        leds.flush()
+        next(play)
+        self.assertEqual(leds.changes(), ([0], False))
+
+    def test_is_current(self):
+        self.assertTrue(framefile.is_current(self.path))
+        self.assertTrue(framefile.is_current(self.path, 3))
+
+    def test_other_length_is_not_current(self):
+        self.assertFalse(framefile.is_current(self.path, 4))
+
+    def test_stale_bake_is_not_current(self):
+        with open(self.path, 'r+b') as file:
+            file.seek(framefile.HEADER.size - 1)
+            last = file.read(1)[0]
+            file.seek(framefile.HEADER.size - 1)
+            file.write(bytes([last ^ 0xff]))
+
+        self.assertFalse(framefile.is_current(self.path))
+
+    def test_missing_file_is_not_current(self):
+        self.assertFalse(framefile.is_current(self.path + '.missing'))
+
+    def test_rainbow_wipe_draws_over(self):
+        self.assertTrue(animatetools.draws_over(animatetools.animations[91]))
+        self.assertFalse(animatetools.draws_over(animatetools.animations[101]))
+
+    def test_wrong_length(self):
+        leds = ledtools.Strip(None, 4, animatetools.BLACK, 255, packed=True)
+        self.assertRaises(ValueError, next, framefile.play([leds], self.path))
+
+    def test_stopping_early(self):
+        leds = ledtools.Strip(None, 3, animatetools.BLACK, 255, packed=True)
+        play = framefile.play([leds], self.path)
+        next(play)
+        play.close()
+
+
+
+if __name__ == '__main__':
+    unittest.main()
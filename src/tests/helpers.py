@@ -0,0 +1,10 @@
+import colour
+
+
+
+def red_then_blue_wipe(strip):
+    for x in strip.on(colour.Color("red"), 1, 100):
+        yield x
+
+    for x in strip.wipe([colour.Color("blue")] * strip.length, 25):
+        yield x
@@ -1,6 +1,7 @@
 import ledtools
 import colortools
 import animatetools
+import spans
 
 import unittest
 import colour
@@ -43,6 +44,131 @@ class TestStrips(unittest.TestCase):
 
 
 
+class TestFill(unittest.TestCase):
+    def test_fill(self):
+        leds = ledtools.Strip(None, 3, colour.Color("blue"), 255, packed=True)
+        leds.flush()
+        leds.fill(colour.Color("red"))
+
+        self.assertEqual(list(leds.buffer), [0xff0000] * 3)
+        self.assertEqual(leds.solid, 0xff0000)
+        self.assertEqual(leds.changes(), ([0, 1, 2], False))
+
+    def test_same_fill_is_not_a_change(self):
+        leds = ledtools.Strip(None, 3, colour.Color("blue"), 255, packed=True)
+        leds.flush()
+        leds.fill(colour.Color("red"))
+        leds.fill(colour.Color("blue"))
+
+        self.assertEqual(leds.changes(), ([], False))
+
+    def test_fill_after_pixels(self):
+        leds = ledtools.Strip(None, 3, colour.Color("blue"), 255, packed=True)
+        leds.set_pixel(1, colour.Color("red"))
+        leds.flush()
+        leds.fill(colour.Color("blue"))
+
+        self.assertEqual(leds.changes(), ([1], False))
+
+    def test_changed_back_is_not_a_change(self):
+        leds = ledtools.Strip(None, 3, colour.Color("blue"), 100, packed=True)
+        leds.flush()
+        leds.set_pixel(1, colour.Color("red"))
+        leds.set_pixel(1, colour.Color("blue"))
+        leds.brightness = 200
+        leds.brightness = 100
+
+        self.assertEqual(leds.changes(), ([], False))
+
+
+
+class TestSharedFrames(unittest.TestCase):
+    def test_identical_strips_are_grouped(self):
+        led1 = ledtools.Strip(None, 3, animatetools.BLACK, 255, packed=True)
+        led2 = ledtools.Strip(None, 3, animatetools.BLACK, 255, packed=True)
+        led3 = ledtools.Strip(None, 4, animatetools.BLACK, 255, packed=True)
+        led4 = ledtools.Strip(None, 3, animatetools.RED, 255, packed=True)
+
+        self.assertEqual(ledtools.Strips([led1, led2, led3, led4]).identical_groups(), [[led1, led2], [led3], [led4]])
+
+    def test_covering_animations_group_strips_of_the_same_kind(self):
+        led1 = ledtools.Strip(None, 3, animatetools.BLACK, 255, packed=True)
+        led2 = ledtools.Strip(None, 3, animatetools.RED, 255, packed=True)
+        led3 = ledtools.Strip(None, 3, animatetools.RED, 255)
+
+        self.assertEqual(ledtools.Strips([led1, led2, led3]).identical_groups(animatetools.animations[101]), [[led1, led2], [led3]])
+
+    def test_draws_over_only_groups_identical_strips(self):
+        led1 = ledtools.Strip(None, 3, animatetools.BLACK, 255, packed=True)
+        led2 = ledtools.Strip(None, 3, animatetools.BLACK, 255, packed=True)
+        led3 = ledtools.Strip(None, 3, animatetools.RED, 255, packed=True)
+
+        self.assertEqual(ledtools.Strips([led1, led2, led3]).identical_groups(animatetools.animations[91]), [[led1, led2], [led3]])
+
+    def test_strips_showing_different_colours_share(self):
+        calls = []
+        led1 = ledtools.Strip(None, 3, animatetools.RED, 255, packed=True)
+        led2 = ledtools.Strip(None, 3, animatetools.LIME, 255, packed=True)
+
+        @animatetools.covers_strip
+        def counted():
+            def with_strip(strip):
+                calls.append(strip)
+
+                for x in animatetools.animations[101](strip):
+                    yield x
+
+            return with_strip
+
+        animation = counted()
+
+        for _ in ledtools.Strips([led1, led2]).animate(animation):
+            self.assertEqual(led1.buffer, led2.buffer)
+
+        self.assertEqual(calls, [led1])
+
+    def test_draws_over_matches_running_alone(self):
+        led1 = ledtools.Strip(None, 6, animatetools.RED, 255, packed=True)
+        led2 = ledtools.Strip(None, 6, animatetools.LIME, 255, packed=True)
+        alone = ledtools.Strip(None, 6, animatetools.LIME, 255, packed=True)
+
+        for _ in zip(ledtools.Strips([led1, led2]).animate(animatetools.animations[91]), ledtools.Strips([alone]).animate(animatetools.animations[91])):
+            self.assertEqual(led2.buffer, alone.buffer)
+
+    def test_share_frames_off(self):
+        led1 = ledtools.Strip(None, 3, animatetools.BLACK, 255)
+        led2 = ledtools.Strip(None, 3, animatetools.BLACK, 255)
+
+        self.assertEqual(ledtools.Strips([led1, led2], share_frames=False).identical_groups(), [[led1], [led2]])
+
+    def test_animation_runs_once(self):
+        calls = []
+
+        def animation(strip):
+            calls.append(strip)
+
+            for x in strip.wipe([colour.Color("orange")] * strip.length, 0):
+                yield x
+
+        led1 = ledtools.Strip(None, 3, animatetools.BLACK, 255, packed=True)
+        led2 = ledtools.Strip(None, 3, animatetools.BLACK, 255, packed=True)
+
+        for _ in ledtools.Strips([led1, led2]).animate(animation):
+            self.assertEqual(led1.buffer, led2.buffer)
+            self.assertEqual(led1.changes(), led2.changes())
+
+        self.assertEqual(calls, [led1])
+
+    def test_unpacked(self):
+        led1 = ledtools.Strip(None, 3, animatetools.BLACK, 255)
+        led2 = ledtools.Strip(None, 3, animatetools.BLACK, 255)
+
+        for _ in ledtools.Strips([led1, led2]).animate(animatetools.animations[101]):
+            self.assertEqual(led1.pixels, led2.pixels)
+            self.assertEqual(led1.brightness, led2.brightness)
+
+
+
 class TestStrip(unittest.TestCase):
     leds = ledtools.Strip(None, 6, colour.Color("blue"), 255)
 
@@ -50,6 +176,188 @@ class TestStrip(unittest.TestCase):
         self.assertEqual(self.leds.pixels, [colour.Color("blue"), colour.Color("blue"), colour.Color("blue"), colour.Color("blue"), colour.Color("blue"), colour.Color("blue")])
 
 
+class TestChanges(unittest.TestCase):
+    def test_all_dirty_on_init(self):
+        leds = ledtools.Strip(None, 3, colour.Color("blue"), 255)
+        self.assertEqual(leds.changes(), ([0, 1, 2], True))
+
+    def test_flush(self):
+        leds = ledtools.Strip(None, 3, colour.Color("blue"), 255)
+        leds.flush()
+        self.assertEqual(leds.changes(), ([], False))
+
+    def test_wipe_only_changes_one_pixel(self):
+        leds = ledtools.Strip(None, 3, colour.Color("blue"), 255)
+        leds.flush()
+        wipe = leds.wipe([colour.Color("orange")] * 3, 0)
+
+        next(wipe)
+        self.assertEqual(leds.changes(), ([0], False))
+        leds.flush()
+
+        next(wipe)
+        self.assertEqual(leds.changes(), ([1], False))
+
+    def test_same_color_is_not_a_change(self):
+        red = colour.Color("red")
+        leds = ledtools.Strip(None, 3, red, 255)
+        leds.flush()
+        leds.monochrome_pixels(red)
+        self.assertEqual(leds.changes(), ([], False))
+
+    def test_brightness_only(self):
+        leds = ledtools.Strip(None, 3, colour.Color("blue"), 100)
+        leds.flush()
+        fade = leds.fade_brightness(100, 255, 0)
+
+        next(fade)
+        leds.flush()
+        next(fade)
+        self.assertEqual(leds.changes(), ([], True))
+
+
+
+class TestPacked(unittest.TestCase):
+    def test_init(self):
+        leds = ledtools.Strip(None, 3, colour.Color("blue"), 255, packed=True)
+        self.assertEqual(list(leds.buffer), [0x0000ff, 0x0000ff, 0x0000ff])
+        self.assertEqual(leds.pixels, [colour.Color("blue")] * 3)
+
+    def test_set_pixel(self):
+        leds = ledtools.Strip(None, 3, colour.Color("blue"), 255, packed=True)
+        leds.flush()
+        leds.set_pixel(1, colour.Color("red"))
+
+        self.assertEqual(list(leds.buffer), [0x0000ff, 0xff0000, 0x0000ff])
+        self.assertEqual(leds.changes(), ([1], False))
+
+    def test_same_value_is_not_a_change(self):
+        leds = ledtools.Strip(None, 3, colour.Color("blue"), 255, packed=True)
+        leds.flush()
+        leds.monochrome_pixels(colour.Color("blue"))
+        self.assertEqual(leds.changes(), ([], False))
+
+    def test_cycle(self):
+        leds = ledtools.Strip(None, 4, colour.Color("blue"), 255, packed=True)
+        cycle = leds.cycle([colour.Color("red"), colour.Color("black"), colour.Color("lime")], 0)
+
+        next(cycle)
+        self.assertEqual(list(leds.buffer), [0xff0000, 0x000000, 0x00ff00, 0xff0000])
+
+        next(cycle)
+        self.assertEqual(list(leds.buffer), [0x000000, 0x00ff00, 0xff0000, 0x000000])
+
+        next(cycle)
+        self.assertEqual(list(leds.buffer), [0x00ff00, 0xff0000, 0x000000, 0x00ff00])
+
+        next(cycle)
+        self.assertEqual(list(leds.buffer), [0xff0000, 0x000000, 0x00ff00, 0xff0000])
+
+    def test_cycle_only_changes_moved_pixels(self):
+        black, red = colour.Color("black"), colour.Color("red")
+        leds = ledtools.Strip(None, 7, black, 255, packed=True)
+        cycle = leds.cycle([black] * 5 + [red] * 2, 0)
+
+        next(cycle)
+        leds.flush()
+        next(cycle)
+        self.assertEqual(leds.changes(), ([4, 6], False))
+
+
+
+class TestSpans(unittest.TestCase):
+    def test_init(self):
+        leds = ledtools.Strip(None, 3, colour.Color("blue"), 255, rle=True)
+        self.assertEqual(leds.spans, [(0, 3, 0x0000ff)])
+        self.assertEqual(leds.pixels, [colour.Color("blue")] * 3)
+
+    def test_set_pixel_splits_spans(self):
+        leds = ledtools.Strip(None, 3, colour.Color("blue"), 255, rle=True)
+        leds.flush()
+        leds.set_pixel(1, colour.Color("red"))
+
+        self.assertEqual(leds.spans, [(0, 1, 0x0000ff), (1, 1, 0xff0000), (2, 1, 0x0000ff)])
+        self.assertEqual(leds.changed_spans(), ([(1, 1, 0xff0000)], False))
+        self.assertEqual(leds.changes(), ([1], False))
+
+    def test_set_last_pixel(self):
+        leds = ledtools.Strip(None, 5, colour.Color("black"), 255, rle=True)
+        leds.set_pixel(4, colour.Color("red"))
+
+        same = ledtools.Strip(None, 5, colour.Color("black"), 255, rle=True)
+        same.set_values([0, 0, 0, 0, 0xff0000])
+
+        self.assertEqual(leds.spans, [(0, 4, 0), (4, 1, 0xff0000)])
+        self.assertTrue(leds.same_as(same))
+
+    def test_fill_merges_spans(self):
+        leds = ledtools.Strip(None, 3, colour.Color("blue"), 255, rle=True)
+        leds.set_pixel(1, colour.Color("red"))
+        leds.fill(colour.Color("lime"))
+
+        self.assertEqual(leds.spans, [(0, 3, 0x00ff00)])
+
+    def test_same_value_is_not_a_change(self):
+        leds = ledtools.Strip(None, 3, colour.Color("blue"), 255, rle=True)
+        leds.flush()
+        leds.monochrome_pixels(colour.Color("blue"))
+        self.assertEqual(leds.changed_spans(), ([], False))
+
+    def test_rotate(self):
+        leds = ledtools.Strip(None, 4, colour.Color("blue"), 255, rle=True)
+        leds.set_values([1, 2, 2, 3])
+        leds.rotate(1)
+
+        self.assertEqual(list(leds.values()), [3, 1, 2, 2])
+
+    def test_rotate_by_nothing(self):
+        leds = ledtools.Strip(None, 4, colour.Color("blue"), 255, rle=True)
+        same = ledtools.Strip(None, 4, colour.Color("blue"), 255, rle=True)
+        leds.set_values([1, 2, 2, 3])
+        same.set_values([1, 2, 2, 3])
+        leds.rotate(0)
+
+        self.assertEqual(leds.spans, spans.encode([1, 2, 2, 3]))
+        self.assertTrue(leds.same_as(same))
+
+    def test_rotate_packed(self):
+        leds = ledtools.Strip(None, 4, colour.Color("blue"), 255, packed=True)
+        leds.set_values([1, 2, 2, 3])
+        leds.rotate(-1)
+
+        self.assertEqual(list(leds.values()), [2, 2, 3, 1])
+
+    def test_cycle_matches_packed(self):
+        black, red = colour.Color("black"), colour.Color("red")
+        leds = ledtools.Strip(None, 10, black, 255, rle=True)
+        packed_leds = ledtools.Strip(None, 10, black, 255, packed=True)
+
+        for _ in zip(range(10), leds.cycle([black] * 5 + [red] * 2, 0), packed_leds.cycle([black] * 5 + [red] * 2, 0)):
+            self.assertEqual(leds.values(), packed_leds.buffer)
+            self.assertEqual(leds.changes(), packed_leds.changes())
+            leds.flush()
+            packed_leds.flush()
+
+    def test_cycle_changes_are_spans(self):
+        black, red = colour.Color("black"), colour.Color("red")
+        leds = ledtools.Strip(None, 7, black, 255, rle=True)
+        cycle = leds.cycle([black] * 5 + [red] * 2, 0)
+
+        next(cycle)
+        leds.flush()
+        next(cycle)
+        self.assertEqual(leds.changed_spans(), ([(4, 1, 0xff0000), (6, 1, 0x000000)], False))
+
+    def test_all_animations_match_packed(self):
+        for num, animation in animatetools.animations.items():
+            leds = ledtools.Strip(None, 12, colour.Color("blue"), 255, rle=True)
+            packed_leds = ledtools.Strip(None, 12, colour.Color("blue"), 255, packed=True)
+
+            for _ in zip(animation(leds), animation(packed_leds)):
+                self.assertEqual(leds.values(), packed_leds.buffer, f'animation {num}')
+
+
+
 class TestFlashFor(unittest.TestCase):
     leds = ledtools.Strip(None, 6, colour.Color("orange"), 255)
 
@@ -0,0 +1,75 @@
+import motion
+
+import unittest
+
+
+
+class FakeGPIO:
+    RISING = 31
+
+    def __init__(self):
+        self.level = 0
+        self.callbacks = {}
+
+    def add_event_detect(self, pin, edge, callback):
+        self.callbacks[pin] = callback
+
+    def input(self, pin):
+        return self.level
+
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+
+class TestMotionEvents(unittest.TestCase):
+    def setUp(self):
+        self.gpio = FakeGPIO()
+        self.clock = FakeClock()
+        self.events = motion.MotionEvents(debounce_ms=200, clock=self.clock)
+        self.events.attach(self.gpio, 17)
+
+    def edge(self):
+        self.gpio.callbacks[17](17)
+
+    def test_no_motion(self):
+        self.assertFalse(self.events.moving())
+
+    def test_edge(self):
+        self.edge()
+        self.assertTrue(self.events.moving())
+        self.assertFalse(self.events.moving())
+
+    def test_still_moving(self):
+        self.gpio.level = 1
+        self.assertTrue(self.events.moving())
+
+    def test_debounce(self):
+        heard = []
+        self.events.listeners.append(heard.append)
+        self.edge()
+        self.clock.now = 0.1
+        self.edge()
+        self.clock.now = 0.35
+        self.edge()
+
+        self.assertEqual(heard, [0, 0.35])
+
+    def test_listeners(self):
+        heard = []
+        self.events.listeners.append(heard.append)
+        self.clock.now = 5
+        self.edge()
+
+        self.assertEqual(heard, [5])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
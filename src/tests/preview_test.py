@@ -0,0 +1,80 @@
+import preview
+import render
+import ledtools
+import animatetools
+import colortools
+
+import io
+import unittest
+
+
+
+class TestTerminal(unittest.TestCase):
+    def setUp(self):
+        self.output = io.StringIO()
+        self.terminal = preview.Terminal(self.output, width=4)
+
+    def written(self):
+        written = self.output.getvalue()
+        self.output.seek(0)
+        self.output.truncate()
+        return written
+
+    def test_strips_are_laid_out_under_each_other(self):
+        first = self.terminal.strip(6)
+        second = self.terminal.strip(3)
+
+        self.assertEqual((first.top, second.top, self.terminal.next_row), (1, 4, 6))
+
+    def test_only_changed_cells_are_drawn(self):
+        strip = self.terminal.strip(6)
+        leds = ledtools.Strip(strip, 6, animatetools.BLACK, 255, rle=True)
+        render.update([leds])
+        self.written()
+
+        leds.set_values([0xff0000, 0xff0000], start=2)
+        render.update([leds])
+
+        self.assertEqual(self.written(), '\033[1;3H\033[38;2;255;0;0m' + preview.CELL * 2 + preview.RESET)
+
+    def test_wrapping_moves_the_cursor(self):
+        strip = self.terminal.strip(6)
+        strip.setPixelColor(3, 0xff)
+        strip.setPixelColor(4, 0xff)
+        strip.show()
+
+        self.assertEqual(self.written(), '\033[1;4H\033[38;2;0;0;255m' + preview.CELL + '\033[2;1H' + preview.CELL + preview.RESET)
+
+    def test_nothing_drawn_without_changes(self):
+        strip = self.terminal.strip(6)
+        strip.show()
+
+        self.assertEqual(self.written(), '')
+
+    def test_escapes_are_cached(self):
+        self.assertIs(self.terminal.escape(0xff0000, 100), self.terminal.escape(0xff0000, 100))
+
+    def test_brightness_redraws_everything_dimmed(self):
+        strip = self.terminal.strip(2)
+        strip.setBrightness(0)
+        strip.show()
+
+        self.assertEqual(self.written(), '\033[1;1H\033[38;2;0;0;0m' + preview.CELL * 2 + preview.RESET)
+
+    def test_gamma(self):
+        self.assertEqual(self.terminal.escape(0xff0000, 127), '\033[38;2;127;0;0m')
+
+        corrected = preview.Terminal(self.output, width=4, gamma=colortools.GAMMA)
+        self.assertEqual(corrected.escape(0xff0000, 127), f'\033[38;2;{colortools.gamma_table()[127]};0;0m')
+
+    def test_start_draws_every_strip(self):
+        self.terminal.strip(2)
+        self.terminal.strip(2)
+        self.terminal.start()
+
+        self.assertEqual(self.written().count(preview.CELL), 4)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import render
+import ledtools
+import animatetools
+import framefile
+import bench
+
+import unittest
+import asyncio
+import colour
+import tempfile
+from unittest import mock
+from tests.helpers import red_then_blue_wipe
+
+
+
+class TestUpdate(unittest.TestCase):
+    def test_only_changed_pixels_are_pushed(self):
+        leds = ledtools.Strip(bench.FakePixelStrip(3), 3, animatetools.BLACK, 255, packed=True)
+        render.update([leds])
+        leds.set_pixel(1, colour.Color("red"))
+        render.update([leds])
+
+        self.assertEqual(leds.strip.set_pixel_calls, 4)
+        self.assertEqual(leds.strip.set_brightness_calls, 1)
+        self.assertEqual(list(leds.strip.pixels), [0, 0xff0000, 0])
+
+    def test_unchanged_strips_are_not_shown(self):
+        leds = ledtools.Strip(bench.FakePixelStrip(3), 3, animatetools.BLACK, 255, packed=True)
+        leds.monochrome_pixels(colour.Color("red"))
+        render.update([leds])
+        leds.monochrome_pixels(colour.Color("red"))
+        render.update([leds])
+
+        self.assertEqual(leds.strip.show_calls, 1)
+        self.assertEqual(leds.strip.set_pixel_calls, 3)
+
+
+
+    def test_spans_are_pushed(self):
+        leds = ledtools.Strip(bench.FakePixelStrip(4), 4, animatetools.BLACK, 255, rle=True)
+        render.update([leds])
+        leds.set_values([0, 0xff0000, 0xff0000, 0])
+        render.update([leds])
+
+        self.assertEqual(leds.strip.set_pixel_calls, 6)
+        self.assertEqual(list(leds.strip.pixels), [0, 0xff0000, 0xff0000, 0])
+
+
+
+class TestRenderAhead(unittest.TestCase):
+    def strips(self):
+        return ledtools.Strips([ledtools.Strip(None, 4, animatetools.BLACK, 255, packed=True) for _ in range(2)])
+
+    def test_same_frames_as_animate(self):
+        for num in [1, 53, 101, 126, 150]:
+            ahead = self.strips()
+            live = self.strips()
+            frames = 0
+
+            for ahead_ms, live_ms in zip(render.render_ahead(ahead, animatetools.animations[num]), live.animate(animatetools.animations[num])):
+                frames += 1
+                self.assertEqual(ahead_ms, live_ms)
+
+                for ahead_leds, live_leds in zip(ahead, live):
+                    self.assertEqual(ahead_leds.buffer, live_leds.buffer)
+                    self.assertEqual(ahead_leds.brightness, live_leds.brightness)
+
+            self.assertGreater(frames, 0)
+
+    def test_starts_from_what_the_strips_show(self):
+        ahead = self.strips()
+        live = self.strips()
+
+        for leds in list(ahead) + list(live):
+            leds.fill(animatetools.RED)
+
+        for _ in zip(render.render_ahead(ahead, animatetools.on(animatetools.BLACK, 1)), live.animate(animatetools.on(animatetools.BLACK, 1))):
+            for ahead_leds, live_leds in zip(ahead, live):
+                self.assertEqual(list(ahead_leds.buffer), [0] * 4)
+                self.assertEqual(ahead_leds.buffer, live_leds.buffer)
+
+    def test_errors_are_raised(self):
+        def broken(strip):
+            yield 25
+            raise RuntimeError('broken')
+
+        frames = render.render_ahead(self.strips(), broken)
+        next(frames)
+        self.assertRaises(RuntimeError, next, frames)
+
+    def test_stopping_early(self):
+        frames = render.render_ahead(self.strips(), red_then_blue_wipe)
+        next(frames)
+        frames.close()
+
+
+
+class TestShowFramesAsync(unittest.TestCase):
+    def test_show_frames_async(self):
+        strips = ledtools.Strips([ledtools.Strip(bench.FakePixelStrip(3), 3, animatetools.BLACK, 255, packed=True)])
+        asyncio.run(render.show_frames_async(strips, strips.animate(red_then_blue_wipe)))
+
+        self.assertEqual(list(strips)[0].strip.pixels[2], 0x0000ff)
+
+    def test_cancel_closes_the_frames(self):
+        leds = ledtools.Strip(bench.FakePixelStrip(3), 3, animatetools.BLACK, 255, packed=True)
+        closed = []
+
+        def frames():
+            try:
+                yield 60000
+                yield 0
+            finally:
+                closed.append(True)
+
+        async def cancel():
+            task = asyncio.create_task(render.show_frames_async(ledtools.Strips([leds]), frames()))
+            await asyncio.sleep(0.05)
+            task.cancel()
+
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel())
+
+        self.assertEqual(closed, [True])
+        self.assertEqual(leds.strip.show_calls, 1)
+
+
+
+class TestFramesForNumber(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        patch = mock.patch.object(render, 'BAKED_DIRECTORY', directory.name)
+        patch.start()
+        self.addCleanup(patch.stop)
+        framefile.bake_to_path(animatetools.animations[1], 3, framefile.baked_path(directory.name, 1))
+
+    def strips(self, length):
+        return ledtools.Strips([ledtools.Strip(None, length, animatetools.BLACK, 255, packed=True)])
+
+    def test_plays_the_bake(self):
+        strips = self.strips(3)
+        self.assertEqual(list(render.frames_for_number(strips, 1)), list(framefile.play(self.strips(3), framefile.baked_path(render.BAKED_DIRECTORY, 1))))
+
+    def test_other_length_runs_live(self):
+        strips = self.strips(4)
+        live = self.strips(4)
+
+        self.assertEqual(list(render.frames_for_number(strips, 1)), list(live.animate(animatetools.animations[1])))
+        self.assertEqual(list(strips)[0].buffer, list(live)[0].buffer)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
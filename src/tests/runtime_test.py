@@ -0,0 +1,153 @@
+import runtime
+import ledtools
+import animatetools
+import motion
+import bench
+
+import asyncio
+import unittest
+from unittest import mock
+
+
+
+def make_runtime(**kwargs):
+    strips = ledtools.Strips([ledtools.Strip(bench.FakePixelStrip(10), 10, animatetools.BLACK, 255, packed=True)])
+    return runtime.Runtime(strips, **kwargs)
+
+
+class FakeSampler:
+    def __init__(self):
+        self.samples = 0
+
+    def sample(self):
+        self.samples += 1
+        return 0.01
+
+
+
+class TestRuntime(unittest.TestCase):
+    def test_play_cancels_the_current_animation(self):
+        app = make_runtime()
+
+        async def play():
+            first = await app.play(1)
+            await asyncio.sleep(0.01)
+            second = await app.play(2)
+            await app.stop()
+            return first, second
+
+        first, second = asyncio.run(play())
+
+        self.assertTrue(first.cancelled())
+        self.assertTrue(second.done())
+        self.assertIsNone(app.animation)
+
+    def test_commands(self):
+        ran = []
+
+        async def sweep():
+            ran.append('sweep')
+
+        app = make_runtime(commands={'sweep': sweep})
+        lines = iter(['sweep', 'nope', '1', 'sweep'])
+
+        def read(prompt):
+            try:
+                return next(lines)
+            except StopIteration:
+                raise EOFError
+
+        asyncio.run(app.console(read))
+
+        self.assertEqual(ran, ['sweep', 'sweep'])
+
+    def test_sample(self):
+        sampler = FakeSampler()
+        app = make_runtime(sampler=sampler)
+
+        async def sample():
+            task = asyncio.create_task(app.sample())
+            await asyncio.sleep(0.05)
+            task.cancel()
+
+        asyncio.run(sample())
+
+        self.assertGreater(sampler.samples, 1)
+
+    def test_no_samples_during_an_animation(self):
+        sampler = FakeSampler()
+        app = make_runtime(sampler=sampler)
+        counts = []
+
+        async def sample():
+            app.animation = asyncio.get_running_loop().create_future()
+            task = asyncio.create_task(app.sample())
+            await asyncio.sleep(0.05)
+            counts.append(sampler.samples)
+            app.animation.set_result(None)
+            await asyncio.sleep(0.05)
+            counts.append(sampler.samples)
+            task.cancel()
+
+        asyncio.run(sample())
+
+        self.assertEqual(counts[0], 0)
+        self.assertGreater(counts[1], 0)
+
+    def test_idle_without_motion(self):
+        redraws = []
+        app = make_runtime(idle=redraws.append, motion_events=motion.MotionEvents(), between_ms=10)
+
+        async def watch():
+            app.listen()
+            task = asyncio.create_task(app.watch())
+            await asyncio.sleep(0.05)
+            task.cancel()
+
+        asyncio.run(watch())
+
+        self.assertTrue(redraws[0])
+        self.assertFalse(any(redraws[1:]))
+
+    def test_motion_preempts_the_animation(self):
+        motion_events = motion.MotionEvents(debounce_ms=0)
+        app = make_runtime(idle=lambda redraw: None, motion_events=motion_events, preempt=True, between_ms=10)
+        played = []
+
+        async def watch():
+            app.listen()
+            motion_events.on_edge()
+            task = asyncio.create_task(app.watch())
+            await asyncio.sleep(0.05)
+            played.append(app.animation)
+            motion_events.on_edge()
+            await asyncio.sleep(0.05)
+            played.append(app.animation)
+            task.cancel()
+            await app.stop()
+
+        asyncio.run(watch())
+
+        self.assertIsNot(played[0], played[1])
+        self.assertTrue(played[0].cancelled())
+
+    def test_animation_errors_are_raised(self):
+        def broken(strip):
+            yield 10
+            raise ValueError('broken')
+
+        motion_events = motion.MotionEvents()
+        app = make_runtime(idle=lambda redraw: None, motion_events=motion_events, between_ms=10)
+
+        async def watch():
+            app.listen()
+            motion_events.on_edge()
+            await app.watch()
+
+        with mock.patch.object(animatetools, 'animations', {999: broken}):
+            self.assertRaises(ValueError, asyncio.run, watch())
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import scheduler
+
+import asyncio
+import unittest
+
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += int(seconds * 1000000000)
+
+    def work(self, ms):
+        self.now += ms * scheduler.NS_PER_MS
+
+
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.time = FakeClock()
+
+    def scheduler(self, drop_late=False):
+        return scheduler.Scheduler(drop_late, clock=self.time.clock, sleep=self.time.sleep)
+
+    def test_render_time_comes_out_of_the_delay(self):
+        frame_scheduler = self.scheduler()
+
+        for _ in frame_scheduler.schedule([100, 100, 100]):
+            self.time.work(30)
+
+        self.assertEqual(self.time.sleeps, [0.07, 0.07, 0.07])
+        self.assertEqual(self.time.now, 300 * scheduler.NS_PER_MS)
+
+    def test_lateness(self):
+        frame_scheduler = self.scheduler()
+        renders = iter([0, 150, 0])
+
+        for _ in frame_scheduler.schedule([100, 100, 100]):
+            self.time.work(next(renders))
+
+        self.assertEqual(frame_scheduler.lateness, [0, 0, 50])
+
+    def test_late_frames_are_shown_without_dropping(self):
+        frame_scheduler = self.scheduler()
+        shown = []
+
+        for ms in frame_scheduler.schedule([25, 25, 25, 25]):
+            shown.append(ms)
+            self.time.work(60)
+
+        self.assertEqual(shown, [25, 25, 25, 25])
+        self.assertEqual(self.time.sleeps, [])
+
+    def test_drop_late(self):
+        frame_scheduler = self.scheduler(drop_late=True)
+        shown = []
+
+        for ms in frame_scheduler.schedule([25, 25, 25, 25, 100]):
+            shown.append(ms)
+            self.time.work(60)
+
+        self.assertEqual(shown, [25, 25, 100])
+        self.assertEqual(frame_scheduler.dropped, 2)
+
+    def test_last_frame_is_always_shown(self):
+        frame_scheduler = self.scheduler(drop_late=True)
+        shown = []
+
+        for ms in frame_scheduler.schedule([25, 25]):
+            shown.append(ms)
+            self.time.work(60)
+
+        self.assertEqual(shown, [25, 0])
+
+    def test_schedule_async_drops_late_frames(self):
+        frame_scheduler = self.scheduler(drop_late=True)
+        shown = []
+
+        async def show():
+            async for ms in frame_scheduler.schedule_async([25, 25, 25, 25, 100]):
+                shown.append(ms)
+                self.time.work(60)
+
+        asyncio.run(show())
+
+        self.assertEqual(shown, [25, 25, 100])
+        self.assertEqual(frame_scheduler.dropped, 2)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import sensors
+
+import unittest
+import time
+
+
+
+class FakeResult:
+    def __init__(self, valid, temperature=20, humidity=60):
+        self.valid = valid
+        self.temperature = temperature
+        self.humidity = humidity
+
+    def is_valid(self):
+        return self.valid
+
+
+
+class FakeSensor:
+    def __init__(self, results):
+        self.results = iter(results)
+
+    def read(self):
+        result = next(self.results)
+
+        if isinstance(result, Exception):
+            raise result
+
+        return result
+
+
+
+class TestSampler(unittest.TestCase):
+    def test_valid_result(self):
+        result = FakeResult(True)
+        sampler = sensors.Sampler(FakeSensor([result]), interval=2, clock=lambda: 10)
+
+        self.assertEqual(sampler.sample(), 2)
+        self.assertEqual(sampler.latest, (10, result))
+
+    def test_invalid_results_back_off(self):
+        sampler = sensors.Sampler(FakeSensor([FakeResult(False)] * 6), interval=2, max_backoff=10)
+        delays = [sampler.sample() for _ in range(5)]
+
+        self.assertEqual(delays, [2, 4, 8, 10, 10])
+        self.assertIsNone(sampler.latest)
+
+    def test_invalid_result_keeps_last_valid(self):
+        result = FakeResult(True)
+        sampler = sensors.Sampler(FakeSensor([result, FakeResult(False), RuntimeError('no sensor')]), clock=lambda: 10)
+
+        sampler.sample()
+        sampler.sample()
+        sampler.sample()
+
+        self.assertEqual(sampler.latest, (10, result))
+        self.assertEqual(sampler.failures, 2)
+
+    def test_valid_result_resets_backoff(self):
+        sampler = sensors.Sampler(FakeSensor([FakeResult(False), FakeResult(False), FakeResult(True)]), interval=2)
+        sampler.sample()
+        sampler.sample()
+
+        self.assertEqual(sampler.sample(), 2)
+        self.assertEqual(sampler.failures, 0)
+
+
+
+class TestHistory(unittest.TestCase):
+    def test_ring_buffer(self):
+        history = sensors.History(size=3)
+
+        for i, value in enumerate([20, 21, 22, 23]):
+            history.add(i, value)
+
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history.readings(), [(1, 21), (2, 22), (3, 23)])
+        self.assertEqual(history.mean(), 22)
+
+    def test_median(self):
+        history = sensors.History()
+
+        for value in [20, 24, 21, 22]:
+            history.add(0, value)
+
+        self.assertEqual(history.median(), 21.5)
+
+    def test_ema(self):
+        history = sensors.History(ema_weight=0.5)
+        history.add(0, 20)
+        history.add(1, 22)
+
+        self.assertEqual(history.ema, 21)
+
+    def test_outliers_are_rejected(self):
+        history = sensors.History(max_jump=5)
+
+        for value in [20, 20, 21]:
+            history.add(0, value)
+
+        self.assertFalse(history.add(0, 80))
+        self.assertEqual(history.readings(), [(0, 20), (0, 20), (0, 21)])
+
+    def test_outliers_in_a_row_are_accepted(self):
+        history = sensors.History(max_jump=5)
+
+        for value in [20, 20, 21]:
+            history.add(0, value)
+
+        added = [history.add(0, 30) for _ in range(sensors.MAX_REJECTED + 1)]
+        self.assertEqual(added, [False] * sensors.MAX_REJECTED + [True])
+
+    def test_history_starts_again_after_a_real_jump(self):
+        history = sensors.History(max_jump=5, max_rejected=2)
+
+        for value in [60, 60, 61, 60, 61]:
+            history.add(0, value)
+
+        added = [history.add(1, value) for value in [90, 91, 90]]
+
+        self.assertEqual(added, [False, False, True])
+        self.assertEqual(history.median(), 90)
+        self.assertEqual(history.readings(), [(1, 90), (1, 91), (1, 90)])
+
+    def test_outliers_that_disagree_are_still_rejected(self):
+        history = sensors.History(max_jump=5, max_rejected=2)
+
+        for value in [20, 20, 21]:
+            history.add(0, value)
+
+        self.assertEqual([history.add(0, value) for value in [40, 60, 80, 100]], [False] * 4)
+        self.assertEqual(history.median(), 20)
+
+    def test_median_of_a_full_ring(self):
+        history = sensors.History(size=3, max_jump=100)
+
+        for value in [5, 1, 9, 7, 3]:
+            history.add(0, value)
+
+        self.assertEqual(history.median(), 7)
+
+    def test_empty(self):
+        history = sensors.History()
+        self.assertIsNone(history.mean())
+        self.assertIsNone(history.median())
+        self.assertIsNone(history.ema)
+        self.assertEqual(history.readings(), [])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
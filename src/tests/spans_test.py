@@ -0,0 +1,60 @@
+import spans
+
+import unittest
+
+
+
+class TestSpans(unittest.TestCase):
+    def test_encode(self):
+        self.assertEqual(spans.encode([1, 1, 2, 3, 3, 3]), [(0, 2, 1), (2, 1, 2), (3, 3, 3)])
+
+    def test_decode(self):
+        self.assertEqual(list(spans.decode([(0, 2, 1), (2, 1, 2)])), [1, 1, 2])
+
+    def test_fill(self):
+        self.assertEqual(spans.fill(5, 7), [(0, 5, 7)])
+        self.assertEqual(spans.fill(0, 7), [])
+
+    def test_value_at(self):
+        encoded = spans.encode([1, 1, 2, 3, 3, 3])
+        self.assertEqual([spans.value_at(encoded, i) for i in range(6)], [1, 1, 2, 3, 3, 3])
+
+    def test_sliced(self):
+        encoded = spans.encode([1, 1, 2, 3, 3, 3])
+        self.assertEqual(spans.sliced(encoded, 1, 4), [(0, 1, 1), (1, 1, 2), (2, 1, 3)])
+
+    def test_sliced_to_nothing(self):
+        encoded = spans.encode([1, 1, 2])
+        self.assertEqual(spans.sliced(encoded, 1, 1), [])
+        self.assertEqual(spans.sliced(encoded, 3, 3), [])
+
+    def test_spliced_at_the_end(self):
+        encoded = spans.encode([1, 1, 1])
+        self.assertEqual(spans.spliced(encoded, 2, [(0, 1, 2)]), [(0, 2, 1), (2, 1, 2)])
+
+    def test_spliced_merges(self):
+        encoded = spans.encode([1, 1, 2, 1, 1])
+        self.assertEqual(spans.spliced(encoded, 2, [(0, 1, 1)]), [(0, 5, 1)])
+
+    def test_rotated(self):
+        values = [1, 1, 2, 3, 3, 3]
+
+        for n in range(-7, 8):
+            expected = values[-(n % 6):] + values[:-(n % 6)] if n % 6 else values
+            self.assertEqual(list(spans.decode(spans.rotated(spans.encode(values), n))), expected)
+
+        self.assertEqual(spans.rotated(spans.encode(values), 0), spans.encode(values))
+
+    def test_differences(self):
+        old = spans.encode([1, 1, 1, 2, 2, 2])
+        new = spans.encode([1, 3, 3, 3, 2, 4])
+        self.assertEqual(spans.differences(old, new), [(1, 3, 3), (5, 1, 4)])
+
+    def test_no_differences(self):
+        encoded = spans.encode([1, 2, 3])
+        self.assertEqual(spans.differences(encoded, list(encoded)), [])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import timing
+
+import unittest
+import io
+
+
+
+class TestTimings(unittest.TestCase):
+    def test_disabled_records_nothing(self):
+        timings = timing.Timings()
+        timings.stop('show', timings.start())
+        timings.frame(1, 100)
+
+        self.assertEqual(len(timings.phases), 0)
+        self.assertEqual(len(timings.frames), 0)
+
+    def test_phases(self):
+        timings = timing.Timings(enabled=True)
+
+        for _ in range(3):
+            timings.stop('show', timings.start())
+
+        self.assertEqual(timings.phases['show'].count, 3)
+
+    def test_percentiles(self):
+        phase = timing.Phase()
+
+        for ms in range(1, 101):
+            phase.add(ms)
+
+        self.assertEqual(phase.percentile(50), 51)
+        self.assertEqual(phase.percentile(95), 96)
+        self.assertEqual(phase.max, 100)
+
+    def test_timed(self):
+        timings = timing.Timings(enabled=True)
+        self.assertEqual(list(timings.timed('generate', [25, 50])), [25, 50])
+        self.assertEqual(timings.phases['generate'].count, 2)
+
+    def test_frames_and_missed_deadlines(self):
+        timings = timing.Timings(enabled=True)
+        timings.frame(101, 0)
+        timings.frame(101, 30)
+        timings.dropped(101, 2)
+
+        self.assertEqual(timings.frames[101], 2)
+        self.assertEqual(timings.missed[101], 3)
+
+    def test_dump(self):
+        timings = timing.Timings(enabled=True)
+        timings.phases['show'].add(2)
+        timings.frame(101, 0)
+        output = io.StringIO()
+        timings.dump(output)
+
+        self.assertIn('show', output.getvalue())
+        self.assertIn('101', output.getvalue())
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import sys
+import time
+from collections import Counter, defaultdict, deque
+
+
+# Only the most recent samples are kept for percentiles so this can be left
+# running on the device, counts and maximums are kept for everything
+SAMPLES = 10000
+
+# Frames later than this are counted as missing their deadline
+MISSED_DEADLINE_MS = 1
+
+
+class Phase:
+    def __init__(self):
+        self.samples = deque(maxlen=SAMPLES)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, ms):
+        self.samples.append(ms)
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, percent):
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+
+class Timings:
+    """Opt in timings for each phase of getting a frame onto the strips.
+
+    Nothing is recorded unless *enabled* is set, start and stop are cheap
+    enough to leave in the render loop.
+
+    """
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self):
+        self.phases = defaultdict(Phase)
+        self.frames = Counter()
+        self.missed = Counter()
+
+    def start(self):
+        if self.enabled:
+            return time.perf_counter_ns()
+
+    def stop(self, name, start):
+        if start is not None:
+            self.phases[name].add((time.perf_counter_ns() - start) / 1000000)
+
+    def timed(self, name, frames):
+        """Times how long every next() of a frame generator takes."""
+        frames = iter(frames)
+
+        while True:
+            start = self.start()
+
+            try:
+                ms = next(frames)
+            except StopIteration:
+                return
+
+            self.stop(name, start)
+            yield ms
+
+    def frame(self, animation, late_ms):
+        if self.enabled:
+            self.frames[animation] += 1
+
+            if late_ms > MISSED_DEADLINE_MS:
+                self.missed[animation] += 1
+
+    def dropped(self, animation, count):
+        if self.enabled:
+            self.missed[animation] += count
+
+    def summary(self):
+        lines = ['phase           count      p50ms      p95ms      maxms']
+
+        for name, phase in self.phases.items():
+            lines.append(f'{name:<12} {phase.count:>8} {phase.percentile(50):>10.2f} {phase.percentile(95):>10.2f} {phase.max:>10.2f}')
+
+        lines.append('animation      frames     missed')
+
+        for animation, frames in self.frames.items():
+            lines.append(f'{str(animation):<12} {frames:>8} {self.missed[animation]:>10}')
+
+        return '\n'.join(lines)
+
+    def dump(self, file=None):
+        """Writes the summary to stdout, a file object or a path."""
+        if isinstance(file, str):
+            with open(file, 'w') as output:
+                output.write(self.summary() + '\n')
+
+        else:
+            print(self.summary(), file=file or sys.stdout, flush=True)
+
+
+
+timings = Timings()